@@ -0,0 +1,209 @@
+"""
+Ytelsestest for turneringsmotoren, uten GUI:
+
+    python bench.py                          # alle størrelser, JSON til skjermen
+    python bench.py --out før.json
+    python bench.py --compare før.json       # avslutter med 1 ved regresjon
+
+Alle målinger bruker faste seeds, så to kjøringer gjør nøyaktig samme arbeid.
+For hver måling rapporteres beste og median tid av --repeat forsøk (i millisekunder).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from engine import GroupStageModel, Team, TournamentModel, parse_team_file
+
+SIZES = (8, 64, 512, 4096)
+SEED = 1234
+NOISE_MS = 0.05  # forskjeller under dette er målestøy, ikke regresjoner
+
+
+def make_teams(n):
+    Team.clear_registry()
+    return [Team.intern(f"Lag {i:05d}") for i in range(n)]
+
+
+def n_rounds_max(n):
+    """Flest mulige runder uten at noen møtes to ganger."""
+    return n - 1 + n % 2
+
+
+def random_result(rng):
+    """Gyldig resultat uten tie-break: vinneren har flest kopper igjen."""
+    winner_left = rng.randint(1, 10)
+    loser_left = rng.randint(0, winner_left - 1)
+    if rng.random() < 0.5:
+        return winner_left, loser_left, 1
+    return loser_left, winner_left, 2
+
+
+def timed(setup, run, repeat):
+    """Kjører setup() utenfor tidtakingen og run(data) innenfor, repeat ganger."""
+    times = []
+    for _ in range(repeat):
+        data = setup()
+        start = time.perf_counter()
+        run(data)
+        times.append(time.perf_counter() - start)
+    return {"best_ms": min(times) * 1e3, "median_ms": statistics.median(times) * 1e3}
+
+
+# ---------- Målingene ----------
+# Hver måling er (navn, setup(n), run(data)); setup lager alt som ikke skal måles.
+
+def bench_build_bracket(n):
+    return TournamentModel(), make_teams(n)
+
+
+def run_build_bracket(data):
+    model, teams = data
+    model.build_bracket(teams, seed=SEED)
+
+
+def bench_play_bracket(n):
+    model = TournamentModel()
+    model.build_bracket(make_teams(n), seed=SEED)
+    return model, random.Random(SEED)
+
+
+def run_play_bracket(data):
+    """Setter vinnere runde for runde til det er kåret en mester."""
+    model, rng = data
+    for r in range(model.num_rounds):
+        for i in range(1 << (model.num_rounds - 1 - r)):
+            team1_id, team2_id = model.team_id(r, i, 1), model.team_id(r, i, 2)
+            if team1_id >= 0 or team2_id >= 0:
+                winner = team1_id if team2_id < 0 or (team1_id >= 0 and rng.random() < 0.5) else team2_id
+                model.set_winner(r, i, winner)
+
+
+def bench_generate_matches(n):
+    return GroupStageModel(make_teams(n))
+
+
+def run_generate_matches(group):
+    group.generate_matches(rounds=min(5, n_rounds_max(len(group.teams))), seed=SEED)
+
+
+def bench_result_churn(n):
+    group = GroupStageModel(make_teams(n))
+    group.generate_matches(rounds=min(5, n_rounds_max(n)), seed=SEED)
+    rng = random.Random(SEED)
+    ops = []
+    for _ in range(4 * len(group.matches)):
+        idx = rng.randrange(len(group.matches))
+        ops.append((idx, random_result(rng) if rng.random() < 0.8 else None))
+    return group, ops
+
+
+def run_result_churn(data):
+    """Fører, overskriver og sletter resultater i tilfeldig rekkefølge."""
+    group, ops = data
+    for idx, result in ops:
+        if result is None:
+            group.clear_match_result(idx)
+        else:
+            group.update_match_result(idx, *result)
+
+
+def bench_standings(n):
+    group, ops = bench_result_churn(n)
+    run_result_churn((group, ops))
+    return group
+
+
+def run_standings(group):
+    for _ in range(100):
+        group.standings()
+
+
+def bench_parse_team_file(n):
+    fd, path = tempfile.mkstemp(suffix=".csv", text=True)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write("name,logo\n")
+        for i in range(n):
+            f.write(f"Lag {i:05d},team_logos/lag_{i:05d}.png\n" if i % 2 else f"Lag {i:05d}\n")
+    Team.clear_registry()
+    return path
+
+
+def run_parse_team_file(path):
+    try:
+        parse_team_file(path)
+    finally:
+        os.remove(path)
+
+
+BENCHMARKS = (
+    ("build_bracket", bench_build_bracket, run_build_bracket),
+    ("set_winner til mester", bench_play_bracket, run_play_bracket),
+    ("generate_matches (5 runder)", bench_generate_matches, run_generate_matches),
+    ("resultater fører/sletter", bench_result_churn, run_result_churn),
+    ("standings x100", bench_standings, run_standings),
+    ("parse_team_file", bench_parse_team_file, run_parse_team_file),
+)
+
+
+def run(sizes=SIZES, repeat=5, only=None):
+    results = []
+    for name, setup, body in BENCHMARKS:
+        if only and only not in name:
+            continue
+        for n in sizes:
+            entry = {"name": name, "teams": n, **timed(lambda: setup(n), body, repeat)}
+            results.append(entry)
+            print(f"{name:<30}{n:6d} lag {entry['best_ms']:10.3f} ms", file=sys.stderr)
+    Team.clear_registry()
+    return {"python": platform.python_version(), "machine": platform.machine(),
+            "seed": SEED, "repeat": repeat, "results": results}
+
+
+def compare(old, new, threshold):
+    """Gir linjene for målinger som er mer enn threshold (f.eks. 0.2 = 20 %) tregere."""
+    before = {(r["name"], r["teams"]): r["best_ms"] for r in old["results"]}
+    regressions = []
+    for r in new["results"]:
+        old_ms = before.get((r["name"], r["teams"]))
+        if old_ms and r["best_ms"] > old_ms * (1 + threshold) and r["best_ms"] - old_ms > NOISE_MS:
+            regressions.append(f"{r['name']} ({r['teams']} lag): {old_ms:.3f} ms -> {r['best_ms']:.3f} ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ytelsestest for turneringsmotoren.")
+    parser.add_argument("--sizes", type=lambda s: tuple(int(x) for x in s.split(",")), default=SIZES,
+                        help="antall lag, kommaseparert (standard 8,64,512,4096)")
+    parser.add_argument("--repeat", type=int, default=5, help="antall forsøk per måling (standard 5)")
+    parser.add_argument("--only", help="kjør bare målinger med denne teksten i navnet")
+    parser.add_argument("--out", help="skriv resultatet som JSON til denne fila")
+    parser.add_argument("--compare", help="JSON fra en tidligere kjøring å sammenligne med")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="hvor mye tregere (andel) som regnes som regresjon (standard 0.2)")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.repeat, args.only)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    elif not args.compare:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for line in regressions:
+            print(f"Tregere: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
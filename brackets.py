@@ -1,197 +1,43 @@
 import customtkinter as ctk
-from PIL import Image, ImageTk
-import tkinter.filedialog as fd
 import tkinter as tk
 import math
-import random
-import os, csv
-from pathlib import Path
-
-class TournamentModel:
-    def __init__(self):
-        self.loaded_teams = []  # [{"name": ..., "logo": ...}, ...]
-        self.teams = []
-        self.rounds = []  # Hver runde er en liste med kamper
-
-    def build_bracket(self, teams_input):
-
-        team_objs = []
-        for item in teams_input:
-            if isinstance(item, dict):
-                name = str(item.get("name", "")).strip()
-                logo = item.get("logo")
-            else:
-                name = str(item).strip()
-                logo = None
-            if not name:
-                continue
-            team_objs.append({"name": name, "logo": logo})
-
-        teams_shuffled = team_objs[:]
-        random.shuffle(teams_shuffled)
-        self.teams = teams_shuffled
-
-        n = len(self.teams)
-        size = 1
-        while size < n:
-            size *= 2
-
-        seeds = self.teams + [None] * (size - n)
-        first_round = []
-        for i in range(0, size, 2):
-            first_round.append({"team1": seeds[i], "team2": seeds[i+1], "winner": None, "start_time": None})
-        self.rounds = [first_round]
-
-        rsize = size // 2
-        while rsize >= 1:
-            matches = []
-            for _ in range(rsize // 2):
-                matches.append({"team1": None, "team2": None, "winner": None, "start_time": None})
-            if rsize // 2 > 0:
-                self.rounds.append(matches)
-            rsize //= 2
-
-
-    def set_winner(self, round_index, match_index, winner):
-        self.rounds[round_index][match_index]["winner"] = winner
-        if round_index + 1 < len(self.rounds):
-            next_match_index = match_index // 2
-            match = self.rounds[round_index + 1][next_match_index]
-            if match["team1"] is None:
-                match["team1"] = winner
-            elif match["team2"] is None:
-                match["team2"] = winner
-
-    def set_start_time(self, round_index, match_index, start_time):
-        self.rounds[round_index][match_index]["start_time"] = start_time
-
-    def set_match_teams(self, round_index, match_index, team1, team2):
-        self.rounds[round_index][match_index]["team1"] = team1
-        self.rounds[round_index][match_index]["team2"] = team2
-        self.rounds[round_index][match_index]["winner"] = None
-        self.rounds[round_index][match_index]["start_time"] = None
-
-    def get_rounds(self):
-        return self.rounds
-
-class GroupStageModel:
-    def __init__(self, teams):
-        self.teams = []
-        for team in teams:
-            self.teams.append({
-                "name": team["name"],
-                "logo": team.get("logo"),
-                "wins": 0,
-                "cups_hit": 0,
-                "cups_missed": 0,
-                "total_cups_diff": 0
-            })
-        self.matches = []
-
-    def generate_matches(self):
-        teams_shuffled = self.teams[:]
-        random.shuffle(teams_shuffled)
-        
-        n = len(teams_shuffled)
-        assert n % 2 == 0, "Antall lag bør være partall for dette oppsettet."
-        
-        # Sørg for at ingen møter samme motstander to ganger
-        round1 = []
-        for i in range(0, n, 2):
-            round1.append({"team1": teams_shuffled[i], "team2": teams_shuffled[i+1], 
-                           "team1_cups_left": None, "team2_cups_left": None, "time": None, "played":False})
-
-        # Lag en ny tilfeldig rekkefølge og sørg for unike kamper
-        round2 = []
-        valid_round = False
-        while not valid_round:
-            random.shuffle(teams_shuffled)
-            round2 = [{"team1": teams_shuffled[i], "team2": teams_shuffled[i+1],
-                       "team1_cups_left": None, "team2_cups_left": None, "time": None, "played":False}
-                      for i in range(0, n, 2)]
-            # sjekk at ingen par går igjen fra runde 1
-            valid_round = all(
-                set((m["team1"]["name"], m["team2"]["name"])) not in 
-                [set((m1["team1"]["name"], m1["team2"]["name"])) for m1 in round1]
-                for m in round2
-            )
-
-        self.matches = round1 + round2
-
-    def update_match_result(self, match_index, cups_left_team1, cups_left_team2, winner):
-        match = self.matches[match_index]
-
-        # Rull tilbake gammelt resultat hvis kampen var spilt
-        if match.get("played"):
-            prev_c1 = match.get("team1_cups_left")
-            prev_c2 = match.get("team2_cups_left")
-            prev_w  = match.get("winner")
-            if prev_c1 is not None and prev_c2 is not None and prev_w in (1, 2):
-                self._apply_result(match, prev_c1, prev_c2, prev_w, sign=-1)
-
-        # Lagre nytt resultat og påfør
-        match["team1_cups_left"] = cups_left_team1
-        match["team2_cups_left"] = cups_left_team2
-        match["winner"] = winner
-        self._apply_result(match, cups_left_team1, cups_left_team2, winner, sign=+1)
-        match["played"] = True
-
-
-    def standings(self):
-        return sorted(self.teams, key=lambda x: (
-            -x["wins"], -x["cups_hit"], -x["total_cups_diff"]
-        ))
-    
-    def _apply_result(self, match, cups_left_team1, cups_left_team2, winner, sign=+1):
-        """Påfør (sign=+1) eller rull tilbake (sign=-1) et resultat i tabellen."""
-        team1 = next(t for t in self.teams if t["name"] == match["team1"]["name"])
-        team2 = next(t for t in self.teams if t["name"] == match["team2"]["name"])
-
-        cups_hit_team1 = 10 - cups_left_team2
-        cups_hit_team2 = 10 - cups_left_team1
-
-        # Poeng
-        if cups_left_team1 != cups_left_team2:
-            if cups_left_team1 > cups_left_team2 and winner == 1:
-                team1['wins'] += 2 * sign
-            elif cups_left_team1 < cups_left_team2 and winner == 2:
-                team2['wins'] += 2 * sign
-            else:
-                raise ValueError("Ugyldig kombinasjon av kopper/vinner")
-        else:
-            team1['wins'] += 1 * sign
-            team2['wins'] += 1 * sign
-            if winner == 1 and cups_left_team1 == cups_hit_team2:
-                team1['wins'] += 1 * sign
-            elif winner == 2 and cups_left_team1 == cups_hit_team2:
-                team2['wins'] += 1 * sign
-            else:
-                raise ValueError("Ugyldig tie-break kombinasjon")
-
-        # Statistikk
-        team1["cups_hit"]    += cups_hit_team1 * sign
-        team1["cups_missed"] += cups_hit_team2 * sign
-        team1["total_cups_diff"] = team1["cups_hit"] - team1["cups_missed"]
+import sys
+from logo_cache import logo_cache
+from layout import bracket_layout
+from perf import ENABLED as PERF_ENABLED, PerfOverlay, timed
+# Modellene ligger i engine.py (uten GUI-avhengigheter) og re-eksporteres herfra,
+# så "from brackets import TournamentModel" fortsatt virker
+from engine import (ChangeNotifier, UndoHistory, Team, as_team, TournamentModel, GroupStageModel,
+                    PooledGroupStage, TournamentJournal, group_stage_from_state, split_smart, parse_results,
+                    parse_team_file)
+
+
+class CoalescedRefresh:
+    """
+    Abonnent som samler opp modellhendelser og kaller handler(hendelser) én gang
+    per idle-runde i Tk, uansett hvor mange endringer som kom i mellomtiden.
+    """
+    def __init__(self, widget, handler):
+        self.widget = widget
+        self.handler = handler
+        self._events = []
+        self._after_id = None
 
-        team2["cups_hit"]    += cups_hit_team2 * sign
-        team2["cups_missed"] += cups_hit_team1 * sign
-        team2["total_cups_diff"] = team2["cups_hit"] - team2["cups_missed"]
+    def __call__(self, events):
+        self._events.extend(events)
+        if self._after_id is None:
+            self._after_id = self.widget.after_idle(self._flush)
 
-    def clear_match_result(self, match_index):
-        match = self.matches[match_index]
-        if not match.get("played"):
-            return
-        prev_c1 = match.get("team1_cups_left")
-        prev_c2 = match.get("team2_cups_left")
-        prev_w  = match.get("winner")
-        if prev_c1 is not None and prev_c2 is not None and prev_w in (1, 2):
-            self._apply_result(match, prev_c1, prev_c2, prev_w, sign=-1)
+    def _flush(self):
+        self._after_id = None
+        events, self._events = self._events, []
+        if events:
+            self.handler(events)
 
-        match["team1_cups_left"] = None
-        match["team2_cups_left"] = None
-        match["winner"] = None
-        match["played"] = False
 
+def changed_keys(events, kind="match"):
+    """Nøklene til hendelsene av en gitt type, uten duplikater og i opprinnelig rekkefølge."""
+    return list(dict.fromkeys(key for k, key, _ in events if k == kind and key is not None))
 
 
 class TournamentBracketCanvas(ctk.CTkFrame):
@@ -208,29 +54,83 @@ class TournamentBracketCanvas(ctk.CTkFrame):
             
         self.canvas = tk.Canvas(self, bg=canvas_bg, highlightthickness=0, bd=0)
         self.canvas.pack(fill="both", expand=True)
-        self.canvas.bind("<Configure>", lambda event: self.draw_bracket())
+        self.canvas.bind("<Configure>", self._on_configure)
+        self._relayout_id = None  # planlagt relayout etter en serie med <Configure>-hendelser
 
         self.images = []  # Holder referanser til bilder
+        # Canvas-elementer per kamp i braketten, slik at enkeltkamper kan oppdateres uten full omtegning
+        self._match_items = {}   # (runde, kamp) -> {"box": id, "time": id, "text": id}
+        self._connector_ids = []  # koblingslinjer i samme rekkefølge som layout.edges
+        self._match_geom = {}    # (runde, kamp) -> (x, y, x0, x1)
+        self._match_images = {}  # (runde, kamp) -> [PhotoImage, ...]
+        self._bracket_shape = None  # antall kamper per runde da braketten sist ble tegnet
+        self.pools_per_page = 4  # antall grupper som vises side om side
+        self.pool_page = 0
+        self._redraw = self.draw_bracket  # Visningen som tegnes på nytt når logoer blir klare
+        logo_cache.add_listener(self, self._on_logos_ready)
+
+        # Modellendringer tegnes én gang per idle-runde
+        self._group_model = None  # gruppespillet som vises og følges akkurat nå
+        self._group_listener = CoalescedRefresh(self, self._on_group_events)
+        self.tournament_model.subscribe(CoalescedRefresh(self, self._on_bracket_events))
+
+        # Med --perf / BRACKETS_PERF=1 vises tidsmålingene oppå braketten (F3 slår av/på)
+        self.perf_overlay = None
+        if PERF_ENABLED:
+            self.perf_overlay = PerfOverlay(self.canvas)
+            self.winfo_toplevel().bind("<F3>", self.perf_overlay.toggle, add="+")
 
         self.draw_bracket()
+
+    def _draw_logo(self, path, x, y, size, mode="fit", tags=(), images=None):
+        """Tegner logoen fra cachen, eller en enkel plassholder mens den dekodes i bakgrunnen."""
+        logo_img = logo_cache.get(path, (size, size), mode=mode)
+        if logo_img:
+            self.canvas.create_image(x, y, image=logo_img, tags=tags)
+            (self.images if images is None else images).append(logo_img)
+        elif logo_cache.pending(path):
+            half = size / 2
+            self.canvas.create_rectangle(x - half, y - half, x + half, y + half, outline="gray40", dash=(2, 2), tags=tags)
         
+    def _watch_group(self, group_stage_model):
+        """Følg endringene i gruppespillet som vises (None når en annen visning er aktiv)."""
+        if group_stage_model is self._group_model:
+            return
+        if self._group_model is not None:
+            self._group_model.unsubscribe(self._group_listener)
+        self._group_model = group_stage_model
+        if group_stage_model is not None:
+            group_stage_model.subscribe(self._group_listener)
+
+    def _on_group_events(self, events):
+        if self._group_model is not None:
+            self._redraw()
+
+    def _on_bracket_events(self, events):
+        if any(kind == "bracket" for kind, _, _ in events):
+            self.draw_bracket()
+        else:
+            self.update_matches(changed_keys(events))
+
     def show_winner_popup(self, winner):
+        self._redraw = lambda: self.show_winner_popup(winner)
+        self._bracket_shape = None
         canvas_width = self.canvas.winfo_width()
         canvas_height = self.canvas.winfo_height()
         self.canvas.delete('all')
         self.canvas.create_text(canvas_width/2, canvas_height/2 - 300, text= f'🏆 Vinner av turnering! 🏆', font=('Arial', 60), fill='white')
-        self.canvas.create_text(canvas_width/2, canvas_height/2 - 200, text= f'{winner['name']}', font=('Arial', 60), fill='white')
-        if winner["logo"]:
-            try:
-                img = Image.open(winner["logo"])
-                img.thumbnail((canvas_height/3, canvas_height/3), Image.LANCZOS)
-                logo_img = ImageTk.PhotoImage(img)
-                self.canvas.create_image(canvas_width / 2, canvas_height/2 + canvas_height/6, image=logo_img)
-                self.images.append(logo_img)
-            except Exception as e:
-                print(f"Feil ved lasting av logo: {e}")
+        self.canvas.create_text(canvas_width/2, canvas_height/2 - 200, text= f'{winner.name}', font=('Arial', 60), fill='white')
+        if winner.logo:
+            self._draw_logo(winner.logo, canvas_width / 2, canvas_height/2 + canvas_height/6, canvas_height/3)
 
+    @timed("show_group_stage")
     def show_group_stage(self, group_stage_model):
+        if isinstance(group_stage_model, PooledGroupStage):
+            self.show_pools(group_stage_model)
+            return
+        self._watch_group(group_stage_model)
+        self._redraw = lambda: self.show_group_stage(group_stage_model)
+        self._bracket_shape = None
         self.canvas.delete("all")  # tøm eksisterende brackets
         self.images.clear()
         
@@ -267,20 +167,13 @@ class TournamentBracketCanvas(ctk.CTkFrame):
             results_x = 3*box_width/4
             fontsize = int(box_height/4)
             
-            self.canvas.create_text(teamname_x, text_ypos, text=f'{idx}. {team['name']}', font=('Arial', fontsize), fill='white', anchor='w')
-            self.canvas.create_text(results_x, text_ypos, text=f'V    |    T    |    D\n{team['wins']}    |    {team['cups_hit']}    |    {team['total_cups_diff']}', font=('Arial', fontsize), fill='white', justify='left')
+            self.canvas.create_text(teamname_x, text_ypos, text=f'{idx}. {team.name}', font=('Arial', fontsize), fill='white', anchor='w')
+            self.canvas.create_text(results_x, text_ypos, text=f'V    |    T    |    D\n{team.wins}    |    {team.cups_hit}    |    {team.total_cups_diff}', font=('Arial', fontsize), fill='white', justify='left')
 
             
             # Logoer
-            if team["logo"]:
-                try:
-                    img = Image.open(team["logo"])
-                    img.thumbnail((thumbnail_size, thumbnail_size), Image.LANCZOS)
-                    logo_img = ImageTk.PhotoImage(img)
-                    self.canvas.create_image(box_width/8, text_ypos-box_pady/2, image=logo_img)
-                    self.images.append(logo_img)
-                except Exception as e:
-                    print(f"Feil ved lasting av logo: {e}")
+            if team.logo:
+                self._draw_logo(team.logo, box_width/8, text_ypos-box_pady/2, thumbnail_size)
 
         # Vis kamper til høyre
         matches_start_y = 80
@@ -301,161 +194,376 @@ class TournamentBracketCanvas(ctk.CTkFrame):
             
             if match['time']:
                 if match['played']:
-                    self.canvas.create_text(teamname1_x, text_ypos + box_height/6, text=f'{match['team1']['name']}', font=('Arial overstrike', int(fontsize*3/4)), fill='white', justify='left')
+                    self.canvas.create_text(teamname1_x, text_ypos + box_height/6, text=f'{match['team1'].name}', font=('Arial overstrike', int(fontsize*3/4)), fill='white', justify='left')
                     self.canvas.create_text(matches_start_x + box2_width/2, text_ypos + box_height/6, text=f'vs', font=('Arial', fontsize), fill='white')
-                    self.canvas.create_text(teamname2_x, text_ypos + box_height/6, text=f'{match['team2']['name']}', font=('Arial', int(fontsize*3/4)), fill='white', justify='right')
+                    self.canvas.create_text(teamname2_x, text_ypos + box_height/6, text=f'{match['team2'].name}', font=('Arial', int(fontsize*3/4)), fill='white', justify='right')
                 else:
-                    self.canvas.create_text(teamname1_x, text_ypos + box_height/6, text=f'{match['team1']['name']}', font=('Arial', int(fontsize*3/4)), fill='white', justify='left')
+                    self.canvas.create_text(teamname1_x, text_ypos + box_height/6, text=f'{match['team1'].name}', font=('Arial', int(fontsize*3/4)), fill='white', justify='left')
                     self.canvas.create_text(matches_start_x + box2_width/2, text_ypos + box_height/6, text=f'vs', font=('Arial', fontsize), fill='white')
-                    self.canvas.create_text(teamname2_x, text_ypos + box_height/6, text=f'{match['team2']['name']}', font=('Arial', int(fontsize*3/4)), fill='white', justify='right')
+                    self.canvas.create_text(teamname2_x, text_ypos + box_height/6, text=f'{match['team2'].name}', font=('Arial', int(fontsize*3/4)), fill='white', justify='right')
 
                 # Legg inn tidspunkt
                 self.canvas.create_text(matches_start_x + box2_width/2, time_ypos, text=f'Starter: {match['time']}', font=('Arial', int(fontsize*4/5)), fill='white')
                 
             else:
                 # Tegn kamper
-                self.canvas.create_text(teamname1_x, text_ypos, text=f'{match['team1']['name']}', font=('Arial', int(fontsize*3/4)), fill='white', justify='left')
+                self.canvas.create_text(teamname1_x, text_ypos, text=f'{match['team1'].name}', font=('Arial', int(fontsize*3/4)), fill='white', justify='left')
                 self.canvas.create_text(matches_start_x + box2_width/2, text_ypos, text=f'vs', font=('Arial', fontsize), fill='white')
-                self.canvas.create_text(teamname2_x, text_ypos, text=f'{match['team2']['name']}', font=('Arial', int(fontsize*3/4)), fill='white', justify='right')
+                self.canvas.create_text(teamname2_x, text_ypos, text=f'{match['team2'].name}', font=('Arial', int(fontsize*3/4)), fill='white', justify='right')
                     
                     
                     
                     
             # Logoer
-            if match['team1']['logo']:
-                try:
-                    img = Image.open(match['team1']['logo'])
-                    img.thumbnail((thumbnail_size, thumbnail_size), Image.LANCZOS)
-                    logo_img = ImageTk.PhotoImage(img)
-                    self.canvas.create_image(matches_start_x + box2_width/8, text_ypos-box_pady/2, image=logo_img)
-                    self.images.append(logo_img)
-                except Exception as e:
-                    print(f"Feil ved lasting av logo: {e}")
+            if match['team1'].logo:
+                self._draw_logo(match['team1'].logo, matches_start_x + box2_width/8, text_ypos-box_pady/2, thumbnail_size)
             
-            if match['team2']['logo']:
-                try:
-                    img = Image.open(match['team2']['logo'])
-                    img.thumbnail((thumbnail_size, thumbnail_size), Image.LANCZOS)
-                    logo_img = ImageTk.PhotoImage(img)
-                    self.canvas.create_image(matches_start_x + box2_width*7/8, text_ypos-box_pady/2, image=logo_img)
-                    self.images.append(logo_img)
-                except Exception as e:
-                    print(f"Feil ved lasting av logo: {e}")
+            if match['team2'].logo:
+                self._draw_logo(match['team2'].logo, matches_start_x + box2_width*7/8, text_ypos-box_pady/2, thumbnail_size)
+
+    @timed("show_pools")
+    def show_pools(self, pooled_model):
+        """Viser gruppene side om side, pools_per_page om gangen."""
+        self._watch_group(pooled_model)
+        self._redraw = lambda: self.show_pools(pooled_model)
+        self._bracket_shape = None
+        self.canvas.delete("all")
+        self.images.clear()
 
+        canvas_width = self.canvas.winfo_width()
+        canvas_height = self.canvas.winfo_height()
+
+        num_pages = math.ceil(len(pooled_model.pools) / self.pools_per_page)
+        self.pool_page %= num_pages
+        first = self.pool_page * self.pools_per_page
+        visible = range(first, min(first + self.pools_per_page, len(pooled_model.pools)))
+
+        title = "Gruppespill" if num_pages == 1 else f"Gruppespill – side {self.pool_page + 1}/{num_pages}"
+        self.canvas.create_text(canvas_width / 2, 30, text=title, font=("Arial", 30), fill="White")
+
+        column_width = canvas_width / len(visible)
+        for col, p in enumerate(visible):
+            self._draw_pool(pooled_model.pools[p], pooled_model.pool_names[p],
+                            col * column_width, 70, column_width, canvas_height - 70)
+
+    def next_pool_page(self, pooled_model):
+        self.pool_page += 1
+        self.show_pools(pooled_model)
+
+    def _draw_pool(self, pool, title, x0, y0, width, height):
+        """Tegner tabell og kamper for én gruppe i en kolonne."""
+        pad = 10
+        standings = pool.standings()
+        rows = len(standings) + len(pool.matches) + 2  # to overskrifter
+        row_height = min(height / rows, 48)
+        fontsize = max(int(row_height / 3), 8)
+        logo_size = row_height - 8
+
+        self.canvas.create_text(x0 + width / 2, y0, text=title, font=("Arial", 22), fill="white")
+        y = y0 + row_height
+        for idx, team in enumerate(standings, start=1):
+            self.canvas.create_rectangle(x0 + pad, y - row_height / 2 + 2, x0 + width - pad, y + row_height / 2 - 2,
+                                         fill='#333333')
+            if team.logo:
+                self._draw_logo(team.logo, x0 + pad + logo_size / 2 + 4, y, logo_size)
+            self.canvas.create_text(x0 + pad + logo_size + 12, y, text=f"{idx}. {team.name}",
+                                    font=('Arial', fontsize), fill='white', anchor='w')
+            self.canvas.create_text(x0 + width - 2 * pad, y,
+                                    text=f"V {team.wins}  |  T {team.cups_hit}  |  D {team.total_cups_diff}",
+                                    font=('Arial', fontsize), fill='white', anchor='e')
+            y += row_height
+
+        self.canvas.create_text(x0 + width / 2, y, text="Kamper", font=("Arial", 18), fill="white")
+        y += row_height
+        for match in pool.matches:
+            text = f"{match['team1'].name}  vs  {match['team2'].name}"
+            if match["played"]:
+                text += f"   ({match['team1_cups_left']}–{match['team2_cups_left']})"
+            elif match["time"]:
+                text += f"   kl. {match['time']}"
+            self.canvas.create_text(x0 + width / 2, y, text=text, font=('Arial', fontsize), fill='white')
+            y += row_height
+
+    def _on_logos_ready(self):
+        rounds = self.tournament_model.get_rounds()
+        if rounds and self._bracket_shape == [len(round_matches) for round_matches in rounds]:
+            # Braketten står allerede – bytt bare ut logoene
+            for (r, i) in self._match_geom:
+                self._draw_match_logos(r, i, rounds[r][i])
+        else:
+            self._redraw()
+
+    def _on_configure(self, event):
+        # Slå sammen mange <Configure> under dra/endre størrelse til én relayout per bilde (~60 fps)
+        if self._relayout_id is None:
+            self._relayout_id = self.after(16, self._relayout)
+
+    def _relayout(self):
+        """
+        Flytter eksisterende bracket-elementer til ny størrelse med move/coords.
+        Full omtegning skjer bare hvis strukturen er endret eller en annen visning er aktiv.
+        """
+        self._relayout_id = None
+        rounds = self.tournament_model.get_rounds()
+        if not rounds or self._bracket_shape != [len(round_matches) for round_matches in rounds]:
+            self._redraw()
+            return
+
+        layout = self._layout(rounds)
+        half_w = layout.box_width / 2
+        for (r, i), (old_x, old_y, _, _) in self._match_geom.items():
+            x, y = layout.center(r, i)
+            if x != old_x or y != old_y:
+                # Boksene har fast størrelse, så alt innhold i kampen flyttes likt
+                self.canvas.move(f"m{r}_{i}", x - old_x, y - old_y)
+                self._match_geom[(r, i)] = (x, y, x - half_w, x + half_w)
+
+        connectors = layout.connectors
+        for e, line_id in enumerate(self._connector_ids):
+            self.canvas.coords(line_id, *connectors[8 * e:8 * e + 8])
+
+        self.canvas.config(scrollregion=self.canvas.bbox("all"))
+
+    def _layout(self, rounds):
+        return bracket_layout(len(rounds), len(rounds[0]), self.canvas.winfo_width(), self.canvas.winfo_height())
+
+    @timed("draw_bracket")
     def draw_bracket(self):
+        self._watch_group(None)
+        self._redraw = self.draw_bracket
         self.canvas.delete("all")
+        self._match_items.clear()
+        self._connector_ids.clear()
+        self._match_geom.clear()
+        self._match_images.clear()
+        self._bracket_shape = None
         rounds = self.tournament_model.get_rounds()
         if not rounds:
             return
-        num_rounds = len(rounds)
 
-        canvas_width = self.canvas.winfo_width()
-        canvas_height = self.canvas.winfo_height()
-        left_margin = 50
-        right_margin = 50
-        top_margin = 50
-        bottom_margin = 50
-
-        box_width = 300
-        box_height = 80
-
-        horizontal_spacing = ((canvas_width - left_margin - right_margin - num_rounds * box_width) /
-                              (num_rounds - 1)) if num_rounds > 1 else 0
-
-        num_matches_r0 = len(rounds[0])
-        vertical_spacing = ((canvas_height - top_margin - bottom_margin - num_matches_r0 * box_height) /
-                            (num_matches_r0 - 1)) if num_matches_r0 > 1 else 0
-
-        positions = []
-        round0_positions = []
-        for i in range(num_matches_r0):
-            y = top_margin + i * (box_height + vertical_spacing) + box_height / 2
-            x = left_margin + box_width / 2
-            round0_positions.append((x, y))
-        positions.append(round0_positions)
-
-        for r in range(1, num_rounds):
-            prev_positions = positions[r - 1]
-            current_positions = []
-            num_matches = len(rounds[r])
-            for i in range(num_matches):
-                if 2 * i + 1 < len(prev_positions):
-                    y = (prev_positions[2 * i][1] + prev_positions[2 * i + 1][1]) / 2
-                else:
-                    y = prev_positions[2 * i][1]
-                x = left_margin + r * (box_width + horizontal_spacing) + box_width / 2
-                current_positions.append((x, y))
-            positions.append(current_positions)
+        layout = self._layout(rounds)
+        boxes = layout.boxes
 
         self.images.clear()
         for r, round_matches in enumerate(rounds):
+            offset = layout.round_offsets[r]
             for i, match in enumerate(round_matches):
-                (x, y) = positions[r][i]
-                x0, y0 = x - box_width / 2, y - box_height / 2
-                x1, y1 = x + box_width / 2, y + box_height / 2
-                self.canvas.create_rectangle(x0, y0, x1, y1, fill="gray20", outline="black")
-
-                start_text = f"Starter: {match['start_time']}" if match["start_time"] else ""
-                self.canvas.create_text(x, y0 - 20, text=start_text, font=("Helvetica", 12), fill="white")
-
-                team1_name = match["team1"]["name"] if match["team1"] else "TBD"
-                team2_name = match["team2"]["name"] if match["team2"] else "TBD"
-                text = f"{team1_name}\nvs\n{team2_name}"
-                self.canvas.create_text(x, y, text=text, font=("Helvetica", 16), fill="white", justify='center')
-
-                # Tegne logoer
-                logo_size = 40
-                padding = 5
-                if match["team1"] and match["team1"]["logo"]:
-                    try:
-                        img1 = Image.open(match["team1"]["logo"]).resize((logo_size, logo_size))
-                        img1_tk = ImageTk.PhotoImage(img1)
-                        self.canvas.create_image(x0 + logo_size / 2 + padding, y, image=img1_tk)
-                        self.images.append(img1_tk)
-                    except Exception as e:
-                        print(f"Feil ved lasting av logo for {team1_name}: {e}")
-
-                if match["team2"] and match["team2"]["logo"]:
-                    try:
-                        img2 = Image.open(match["team2"]["logo"]).resize((logo_size, logo_size))
-                        img2_tk = ImageTk.PhotoImage(img2)
-                        self.canvas.create_image(x1 - logo_size / 2 - padding, y, image=img2_tk)
-                        self.images.append(img2_tk)
-                    except Exception as e:
-                        print(f"Feil ved lasting av logo for {team2_name}: {e}")
-
-                if r > 0:
-                    child_index = i * 2
-                    parent_x_left = x0
-                    for idx_offset in [0, 1]:
-                        child_idx = child_index + idx_offset
-                        if child_idx < len(positions[r - 1]):
-                            child_x, child_y = positions[r - 1][child_idx]
-                            child_x_right = child_x + box_width / 2
-                            mid_x = (child_x_right + parent_x_left) / 2
-                            self.canvas.create_line(child_x_right, child_y, mid_x, child_y, fill="white")
-                            self.canvas.create_line(mid_x, child_y, mid_x, y, fill="white")
-                            self.canvas.create_line(mid_x, y, parent_x_left, y, fill="white")
+                k = 4 * (offset + i)
+                x0, y0, x1, y1 = boxes[k], boxes[k + 1], boxes[k + 2], boxes[k + 3]
+                x, y = (x0 + x1) / 2, (y0 + y1) / 2
+                match_tag = f"m{r}_{i}"
+                box_id = self.canvas.create_rectangle(x0, y0, x1, y1, fill="gray20", outline="black", tags=("match", match_tag))
+
+                start_text, text = self._match_texts(match)
+                time_id = self.canvas.create_text(x, y0 - 20, text=start_text, font=("Helvetica", 12), fill="white",
+                                                  tags=("match", match_tag))
+                text_id = self.canvas.create_text(x, y, text=text, font=("Helvetica", 16), fill="white", justify='center',
+                                                  tags=("match", match_tag))
+                self._match_items[(r, i)] = {"box": box_id, "time": time_id, "text": text_id}
+                self._match_geom[(r, i)] = (x, y, x0, x1)
+                self._draw_match_logos(r, i, match)
+
+        # Koblingslinjene tegnes som én linje med fire punkter (horisontalt, vertikalt, horisontalt)
+        connectors, edges = layout.connectors, layout.edges
+        for e in range(len(edges) // 3):
+            r, i, idx_offset = edges[3 * e], edges[3 * e + 1], edges[3 * e + 2]
+            self._connector_ids.append(
+                self.canvas.create_line(*connectors[8 * e:8 * e + 8], fill="white",
+                                        tags=("connector", f"c{r}_{i}_{idx_offset}")))
 
         self.canvas.config(scrollregion=self.canvas.bbox("all"))
+        self._bracket_shape = [len(round_matches) for round_matches in rounds]
+
+        last_round = rounds[-1]
+        if len(last_round) == 1 and last_round[0]["winner"]:
+            self.show_winner_popup(last_round[0]["winner"])
+
+    def _match_texts(self, match):
+        start_text = f"Starter: {match['start_time']}" if match["start_time"] else ""
+        team1_name = match["team1"].name if match["team1"] else "TBD"
+        team2_name = match["team2"].name if match["team2"] else "TBD"
+        return start_text, f"{team1_name}\nvs\n{team2_name}"
+
+    def _draw_match_logos(self, r, i, match):
+        x, y, x0, x1 = self._match_geom[(r, i)]
+        logo_tag = f"m{r}_{i}_logo"
+        self.canvas.delete(logo_tag)
+        images = self._match_images[(r, i)] = []
+        logo_size = 40
+        padding = 5
+        if match["team1"] and match["team1"].logo:
+            self._draw_logo(match["team1"].logo, x0 + logo_size / 2 + padding, y, logo_size, mode="exact",
+                            tags=("match", f"m{r}_{i}", logo_tag), images=images)
+
+        if match["team2"] and match["team2"].logo:
+            self._draw_logo(match["team2"].logo, x1 - logo_size / 2 - padding, y, logo_size, mode="exact",
+                            tags=("match", f"m{r}_{i}", logo_tag), images=images)
+
+    @timed("update_matches")
+    def update_matches(self, changed):
+        """
+        Oppdaterer bare kampene i changed (liste med (runde, kamp)) med itemconfig,
+        i stedet for å tegne hele braketten på nytt. Faller tilbake til full tegning
+        hvis braketten ikke vises eller strukturen er endret.
+        """
+        rounds = self.tournament_model.get_rounds()
+        if self._bracket_shape != [len(round_matches) for round_matches in rounds]:
+            self.draw_bracket()
+            return
+
+        for r, i in changed:
+            match = rounds[r][i]
+            start_text, text = self._match_texts(match)
+            items = self._match_items[(r, i)]
+            self.canvas.itemconfig(items["time"], text=start_text)
+            self.canvas.itemconfig(items["text"], text=text)
+            self._draw_match_logos(r, i, match)
 
         last_round = rounds[-1]
         if len(last_round) == 1 and last_round[0]["winner"]:
             self.show_winner_popup(last_round[0]["winner"])
-            
 
     def refresh(self):
         self.draw_bracket()
 
+class MatchControlList(ctk.CTkFrame):
+    """
+    Virtualisert liste med kampkontroller. Bare radene som synes har widgets, og de
+    gjenbrukes når man blar, så store gruppespill ikke lager hundrevis av knapper.
+    Innholdet hentes fra row_spec(indeks), som returnerer
+    {"text": str, "header": bool, "buttons": [(tekst, kommando, tilstand), ...]}.
+    Knappene pakkes fra høyre i den rekkefølgen de står.
+    """
+    row_height = 44
+    max_buttons = 5
+
+    def __init__(self, master, *args, **kwargs):
+        super().__init__(master, *args, **kwargs)
+        self._row_count = 0
+        self._row_spec = None
+        self._first = 0   # indeksen til øverste synlige rad
+        self._rows = []   # gjenbrukbare rad-widgets
+
+        self._body = ctk.CTkFrame(self, fg_color="transparent")
+        self._body.pack(side="left", fill="both", expand=True)
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.pack(side="right", fill="y")
+
+        self._body.bind("<Configure>", lambda event: self._render())
+        self._bind_wheel(self._body)
+
+    def set_rows(self, count, row_spec):
+        """Bytter innhold (f.eks. fra gruppespill til sluttspill) og tegner synlige rader."""
+        self._row_count = count
+        self._row_spec = row_spec
+        self._first = max(0, min(self._first, count - self._visible_count() + 1))
+        for row in self._rows:
+            row["key"] = None
+        self._render()
+
+    def refresh_row(self, index):
+        """Oppdaterer én rad etter en endring – gjør ingenting hvis raden ikke synes."""
+        slot = index - self._first
+        if 0 <= slot < len(self._rows) and index < self._row_count:
+            self._bind_row(self._rows[slot], index)
+
+    def _visible_count(self):
+        return max(1, self._body.winfo_height() // self.row_height + 1)
+
+    def _render(self):
+        visible = self._visible_count()
+        while len(self._rows) < visible:
+            self._rows.append(self._make_row())
+
+        for slot, row in enumerate(self._rows):
+            index = self._first + slot
+            if slot < visible and index < self._row_count:
+                self._bind_row(row, index)
+                if not row["placed"]:
+                    row["frame"].place(x=0, y=slot * self.row_height, relwidth=1)
+                    row["placed"] = True
+            elif row["placed"]:
+                row["frame"].place_forget()
+                row["placed"] = False
+
+        if self._row_count:
+            self._scrollbar.set(self._first / self._row_count,
+                                min(1.0, (self._first + visible - 1) / self._row_count))
+        else:
+            self._scrollbar.set(0, 1)
+
+    def _make_row(self):
+        # customtkinter tillater ikke height i place(), så høyden settes her
+        frame = ctk.CTkFrame(self._body, height=self.row_height - 4)
+        label = ctk.CTkLabel(frame, text="")
+        label.pack(side="left", padx=6)
+        # Tekst med en gang, så knappens tekstetikett finnes når musehjulet bindes
+        buttons = [ctk.CTkButton(frame, text=" ") for _ in range(self.max_buttons)]
+        for widget in (frame, label, *buttons):
+            self._bind_wheel(widget)
+        return {"frame": frame, "label": label, "buttons": buttons, "packed": 0,
+                "fg_color": frame.cget("fg_color"), "header": False, "placed": False, "key": None}
+
+    def _bind_row(self, row, index):
+        spec = self._row_spec(index)
+        # Samme indeks og samme tekster/tilstander betyr at raden allerede viser dette
+        key = (index, spec["text"], spec.get("header", False),
+               tuple((text, state) for text, _, state in spec["buttons"]))
+        if row["key"] == key:
+            return
+        row["key"] = key
+
+        header = spec.get("header", False)
+        if header != row["header"]:
+            row["label"].configure(font=("Arial", 20) if header else ("Arial", 13))
+            row["frame"].configure(fg_color="transparent" if header else row["fg_color"])
+            row["header"] = header
+        row["label"].configure(text=spec["text"])
+
+        n = len(spec["buttons"])
+        if n != row["packed"]:
+            for button in row["buttons"]:
+                button.pack_forget()
+            for button in row["buttons"][:n]:
+                button.pack(side="right", padx=4)
+            row["packed"] = n
+        for button, (text, command, state) in zip(row["buttons"], spec["buttons"]):
+            button.configure(text=text, command=command, state=state)
+
+    def _scroll_to(self, first):
+        first = max(0, min(first, self._row_count - self._visible_count() + 1))
+        if first != self._first:
+            self._first = first
+            self._render()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * self._row_count))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self._visible_count() if args[2] == "pages" else 1)
+            self._scroll_to(self._first + step)
+
+    def _on_wheel(self, event):
+        direction = -1 if (event.num == 4 or getattr(event, "delta", 0) > 0) else 1
+        self._scroll_to(self._first + 3 * direction)
+
+    def _bind_wheel(self, widget):
+        """Musehjulet bindes på hver widget i listen (customtkinter tillater ikke bind_all)."""
+        widget.bind("<MouseWheel>", self._on_wheel, add="+")
+        widget.bind("<Button-4>", self._on_wheel, add="+")
+        widget.bind("<Button-5>", self._on_wheel, add="+")
+
+
 class ControlWindow(ctk.CTkToplevel):
     """
     Kontrollvinduet der du kan legge inn lag, sette vinnere, angi starttidspunkt
     og redigere kampoppsettet.
     """
-    def __init__(self, master, tournament_model, bracket_canvas, *args, **kwargs):
+    def __init__(self, master, tournament_model, bracket_canvas, *args, journal=None, **kwargs):
         super().__init__(master, *args, **kwargs)
         self.tournament_model = tournament_model
         self.bracket_canvas = bracket_canvas
+        self.journal = journal  # TournamentJournal, eller None hvis ingenting skal lagres
         self.title("Kontrollvindu")
         self.geometry("1000x1200")
         team_entry_label = ctk.CTkLabel(self, text="Skriv inn lag (én per linje):")
@@ -474,31 +582,156 @@ class ControlWindow(ctk.CTkToplevel):
         self.logo_switch = False
         load_logo_checkbox = ctk.CTkCheckBox(self, text="Legg til laglogoer", command=self.toggle_load_logo)
         load_logo_checkbox.pack(pady=5)
+
+        self.swiss_switch = False
+        swiss_checkbox = ctk.CTkCheckBox(self, text="Swiss-system (ny runde etter tabell)", command=self.toggle_swiss)
+        swiss_checkbox.pack(pady=5)
+
+        pools_row = ctk.CTkFrame(self, fg_color="transparent")
+        pools_row.pack(pady=5)
+        ctk.CTkLabel(pools_row, text="Antall grupper:").pack(side="left", padx=5)
+        self.pools_menu = ctk.CTkOptionMenu(pools_row, values=["1", "2", "3", "4", "6", "8"], width=70)
+        self.pools_menu.pack(side="left", padx=5)
         
         self.start_group_button = ctk.CTkButton(self, text="Start Gruppespill", command=self.start_group_stage)
         self.start_bracket_button = ctk.CTkButton(self, text="Start Sluttspill", command=self.build_final_bracket)
         self.start_bracket_button.pack_forget()  # skjul til å starte med
 
         self.start_group_button.pack(pady=5)
-        self.match_controls_frame = ctk.CTkScrollableFrame(self)
-        self.match_controls_frame.pack(fill="both", expand=True, pady=10)
+
+        undo_row = ctk.CTkFrame(self, fg_color="transparent")
+        undo_row.pack(pady=5)
+        self.undo_button = ctk.CTkButton(undo_row, text="Angre", command=self.undo, state="disabled")
+        self.undo_button.pack(side="left", padx=5)
+        self.redo_button = ctk.CTkButton(undo_row, text="Gjør om", command=self.redo, state="disabled")
+        self.redo_button.pack(side="left", padx=5)
+        ctk.CTkButton(undo_row, text="Ny turnering", command=self.confirm_new_tournament).pack(side="left", padx=5)
+        self.bind("<Control-z>", self.undo)
+        self.bind("<Control-y>", self.redo)
+        self.bind("<Control-Z>", self.redo)  # Ctrl+Shift+Z
+
+        self.match_list = MatchControlList(self)
+        self.match_list.pack(fill="both", expand=True, pady=(10, 0))
+        self.match_actions_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.match_actions_frame.pack(pady=5)
+        self.group_stage_model = None
+        self._group_listener = CoalescedRefresh(self, self._on_group_events)
+        self.tournament_model.subscribe(CoalescedRefresh(self, self._on_bracket_events))
         self.draw_match_controls()
         self.teams = []
+        if self.journal is not None:
+            self.restore_from_journal()
+            self._sync_journal()
+
+        # Felles angrehistorikk for gruppespill og sluttspill (kobles på etter gjenoppretting)
+        self.history = UndoHistory()
+        self.history.on_change = self._update_undo_buttons
+        self.tournament_model.history = self.history
+        if self.group_stage_model is not None:
+            self.group_stage_model.history = self.history
+
+    def _shortcut_in_text(self, event):
+        # Ctrl+Z i et tekstfelt skal ikke angre turneringen
+        return event is not None and isinstance(event.widget, (tk.Text, tk.Entry))
+
+    def undo(self, event=None):
+        if not self._shortcut_in_text(event):
+            self.history.undo()
+
+    def redo(self, event=None):
+        if not self._shortcut_in_text(event):
+            self.history.redo()
+
+    def _update_undo_buttons(self):
+        undo_label = self.history.undo_label()
+        redo_label = self.history.redo_label()
+        self.undo_button.configure(text=f"Angre {undo_label}" if undo_label else "Angre",
+                                   state="normal" if undo_label else "disabled")
+        self.redo_button.configure(text=f"Gjør om {redo_label}" if redo_label else "Gjør om",
+                                   state="normal" if redo_label else "disabled")
+
+    def restore_from_journal(self):
+        """Gjenoppretter turneringen fra forrige kjøring (f.eks. etter et krasj)."""
+        group = self.journal.restore()
+        if group is None:
+            return
+        self.group_stage_model = group
+        group.subscribe(self._group_listener)
+        self.start_group_button.pack_forget()
+        if not self.tournament_model.get_rounds():
+            # Braketten tegnes fra hendelsene ved første idle; vis gruppespillet etter det
+            self.after_idle(self._show_group_view)
+
+    def _show_group_view(self):
+        self.bracket_canvas.show_group_stage(self.group_stage_model)
+        self.draw_group_match_controls()
+        self.start_bracket_button.pack(pady=5)
+
+    def confirm_new_tournament(self):
+        top = ctk.CTkToplevel(self)
+        top.title("Ny turnering")
+        ctk.CTkLabel(top, text="Starte en ny turnering?\nBrakett, gruppespill og lagret tilstand slettes.").pack(padx=20, pady=(20, 10))
+
+        def do_reset():
+            top.destroy()
+            self.new_tournament()
+
+        btn_row = ctk.CTkFrame(top, fg_color="transparent")
+        btn_row.pack(pady=10)
+        ctk.CTkButton(btn_row, text="Avbryt", command=top.destroy).pack(side="left", padx=6)
+        ctk.CTkButton(btn_row, text="Ny turnering", command=do_reset).pack(side="left", padx=6)
+        top.bind("<Escape>", lambda _e: top.destroy())
+        self._place_dialog_over(top, width=360, height=150)
+        top.grab_set()
+
+    def new_tournament(self):
+        """Starter fra bunnen: tom brakett, ikke noe gruppespill, ingen angrehistorikk og tom journal."""
+        if self.group_stage_model is not None:
+            self.group_stage_model.unsubscribe(self._group_listener)
+            self.group_stage_model = None
+        # Den tomme braketten gir en "bracket"-hendelse som tømmer både canvas og kamplisten
+        self.tournament_model.load_state(TournamentModel().to_state())
+        self.tournament_model.loaded_teams = []
+        if self.journal is not None:
+            self.journal.reset()
+        Team.clear_registry()
+        self.teams = []
+        self.history.clear()
+        self.start_bracket_button.pack_forget()
+        self.start_group_button.pack(pady=5)
+
+    def _sync_journal(self):
+        # fsync samles opp og tas høyst fire ganger i sekundet
+        self.journal.sync()
+        self.after(250, self._sync_journal)
+
+    def _on_bracket_events(self, events):
+        if any(kind == "bracket" for kind, _, _ in events):
+            if not self.tournament_model.get_rounds() and self.group_stage_model is not None:
+                # Sluttspillet er angret bort: tilbake til gruppespillet og kontrollene for det
+                self._show_group_view()
+                return
+            self.draw_match_controls()
+            if self.tournament_model.get_rounds():
+                self.start_bracket_button.pack_forget()
+        elif self.match_list_mode == "knockout":
+            self.refresh_match_controls(changed_keys(events))
+
+    def _on_group_events(self, events):
+        if self.match_list_mode != "group":
+            return
+        if any(kind == "schedule" for kind, _, _ in events):
+            self.draw_group_match_controls()
+        else:
+            for match_index in changed_keys(events):
+                self.refresh_group_match_control(match_index)
 
     def build_final_bracket(self):
         standings = self.group_stage_model.standings()
         top_4 = standings[:4]
-        self.tournament_model.build_bracket([team["name"] for team in top_4])
-
-        # lagre logoer og statistikk
-        for i, team in enumerate(self.tournament_model.teams):
-            team["logo"] = top_4[i]["logo"]
-            team["wins"] = top_4[i]["wins"]
-            team["cups_hit"] = top_4[i]["cups_hit"]
-            team["total_cups_diff"] = top_4[i]["total_cups_diff"]
+        # Samme Team-objekter, så logoer og statistikk følger med uten kopiering
+        self.tournament_model.build_bracket(top_4)
 
-        self.bracket_canvas.refresh()
-        self.draw_match_controls()
         # skjul sluttspillknappen når brackets er laget
         self.start_bracket_button.pack_forget()
 
@@ -508,6 +741,9 @@ class ControlWindow(ctk.CTkToplevel):
         else:
             self.logo_switch = True
             
+    def toggle_swiss(self):
+        self.swiss_switch = not self.swiss_switch
+
     def check_allowed_cup_number(self, cups):
         if cups > 10 or cups < 0:
             raise ValueError
@@ -515,8 +751,8 @@ class ControlWindow(ctk.CTkToplevel):
             
     def set_group_winner_popup(self, match_index, winner):
         match = self.group_stage_model.matches[match_index]
-        team1_name = match['team1']['name']
-        team2_name = match['team2']['name']
+        team1_name = match['team1'].name
+        team2_name = match['team2'].name
 
         # Én dialog med to inputfelt
         top = ctk.CTkToplevel(self)
@@ -549,11 +785,6 @@ class ControlWindow(ctk.CTkToplevel):
                 self.check_allowed_cup_number(c2)
 
                 self.group_stage_model.update_match_result(match_index, c1, c2, winner)
-                self.bracket_canvas.show_group_stage(self.group_stage_model)
-                # (valgfritt) oppdater kontrollrader hvis du viser “rediger/angre”-knapper:
-                if hasattr(self, "draw_group_match_controls"):
-                    self.draw_group_match_controls()
-
                 top.destroy()
             except ValueError:
                 err_lbl.configure(text="Ugyldig antall/kombo. Prøv igjen.")
@@ -576,63 +807,14 @@ class ControlWindow(ctk.CTkToplevel):
         top.wait_window()
 
 
-    def _parse_team_file(self, filepath: str):
-        """Leser fil med lag og valgfrie logostier. Støtter CSV (name,logo) og linjer med , ; | TAB."""
-        teams = []
-        base = Path(filepath).parent
-
-        def split_smart(line: str):
-            # Prøv CSV først
-            try:
-                for row in csv.reader([line]):
-                    return [s.strip() for s in row]
-            except Exception:
-                pass
-            # Fallback: manuell splitting på vanlige delimitere
-            for delim in [",", ";", "|", "\t"]:
-                if delim in line:
-                    return [s.strip() for s in line.split(delim)]
-            return [line.strip()]
-
-        with open(filepath, "r", encoding="utf-8-sig") as f:
-            lines = f.read().splitlines()
-
-        # Hopp over header hvis den ser ut som "name,logo"
-        if lines and ("name" in lines[0].lower() and "logo" in lines[0].lower()):
-            lines = lines[1:]
-
-        for raw in lines:
-            line = raw.strip()
-            if not line or line.startswith("#"):
-                continue
-            parts = split_smart(line)
-            if len(parts) == 1:
-                name = parts[0]
-                logo = None
-            else:
-                name, logo = parts[0], (parts[1] or None)
-
-            if not name:
-                continue
-
-            # Normaliser/absolutt sti til logo hvis oppgitt
-            if logo:
-                p = Path(logo).expanduser()
-                if not p.is_absolute():
-                    p = (base / p).resolve()
-                logo = str(p)
-                # (valgfritt) ikke krav: sjekk om fila finnes
-                # if not Path(logo).is_file(): logo = None
-
-            teams.append({"name": name, "logo": logo})
-        return teams
 
     def _teams_from_textbox(self):
         """Fallback når bruker har skrevet navn i tekstfeltet – ingen logo."""
         names = [ln.strip() for ln in self.team_text.get("1.0", "end").splitlines() if ln.strip()]
-        return [{"name": n, "logo": None} for n in names]
+        return list(dict.fromkeys(Team.intern(n) for n in names))
     
     def load_teams_from_file(self):
+        from tkinter import filedialog as fd  # dialogmodulen lastes først når den trengs
         path = fd.askopenfilename(
             title="Velg lag-fil",
             filetypes=[("CSV/Tekst", "*.csv *.txt *.tsv"), ("Alle filer", "*.*")]
@@ -641,13 +823,15 @@ class ControlWindow(ctk.CTkToplevel):
             return
         try:
             # Les inn og lagre i self.teams
-            self.teams = self._parse_team_file(path)
+            self.teams = parse_team_file(path)
             if not self.teams:
                 raise ValueError("Fant ingen lag i fila.")
+            # Start dekoding av logoene i bakgrunnen med en gang
+            logo_cache.prefetch(t.logo for t in self.teams)
 
             # Vis bare navnene i tekstboksen som en “preview”
             self.team_text.delete("1.0", "end")
-            self.team_text.insert("1.0", "\n".join(t["name"] for t in self.teams))
+            self.team_text.insert("1.0", "\n".join(t.name for t in self.teams))
 
             # Liten bekreftelse
             ok = ctk.CTkToplevel(self)
@@ -674,9 +858,32 @@ class ControlWindow(ctk.CTkToplevel):
         if not self.teams: 
             self.fill_team_list()
 
-        team_list = [{"name": team["name"], "logo": team["logo"]} for team in self.teams]
-        self.group_stage_model = GroupStageModel(team_list)
-        self.group_stage_model.generate_matches()
+        team_list = list(self.teams)
+        if self.group_stage_model is not None:
+            self.group_stage_model.unsubscribe(self._group_listener)
+        num_pools = int(self.pools_menu.get())
+        if num_pools > 1:
+            self.group_stage_model = PooledGroupStage(team_list, num_pools)
+        else:
+            self.group_stage_model = GroupStageModel(team_list)
+        if self.journal is not None:
+            self.journal.attach_group(self.group_stage_model)
+        # Det gamle gruppespillets endringer kan ikke angres i det nye
+        self.history.clear()
+        self.group_stage_model.history = self.history
+
+        if num_pools > 1:
+            self.group_stage_model.generate_matches(rounds=1 if self.swiss_switch else 2)
+        else:
+            # Aldri flere runder enn en full serie gir rom for (ingen med tom lagliste)
+            max_rounds = len(team_list) - 1 + len(team_list) % 2
+            if self.swiss_switch:
+                # Swiss: bare første runde trekkes, resten settes opp etter tabellen
+                self.group_stage_model.generate_matches(rounds=min(1, max_rounds))
+            else:
+                # To runder som før
+                self.group_stage_model.generate_matches(rounds=min(2, max_rounds))
+        self.group_stage_model.subscribe(self._group_listener)
 
         # Vis gruppespillet direkte i bracket_canvas
         self.bracket_canvas.show_group_stage(self.group_stage_model)
@@ -687,60 +894,109 @@ class ControlWindow(ctk.CTkToplevel):
         self.start_group_button.pack_forget()
         self.start_bracket_button.pack(pady=5)
 
+    @timed("draw_group_match_controls")
     def draw_group_match_controls(self):
-        for widget in self.match_controls_frame.winfo_children():
+        # Handlingsknappene under listen er få, så de kan lages på nytt
+        for widget in self.match_actions_frame.winfo_children():
             widget.destroy()
 
-        ctk.CTkLabel(self.match_controls_frame, text="Gruppespillkontroller", font=("Arial", 20)).pack(pady=5)
-
-        for idx, match in enumerate(self.group_stage_model.matches):
-            row = ctk.CTkFrame(self.match_controls_frame)
-            row.pack(fill="x", padx=6, pady=4)
-
-            t1 = match['team1']['name']
-            t2 = match['team2']['name']
-            ctk.CTkLabel(row, text=f"{t1} vs {t2}").pack(side="left", padx=6)
-
-            # Knappene lages alltid, men evt. deaktiveres hvis match er spilt
-            btn_t1 = ctk.CTkButton(
-                row, text=f"{t1} vant",
-                command=lambda i=idx: self.set_group_winner_popup(i, 1)
-            )
-            btn_t1.pack(side="right", padx=4)
-
-            btn_t2 = ctk.CTkButton(
-                row, text=f"{t2} vant",
-                command=lambda i=idx: self.set_group_winner_popup(i, 2)
-            )
-            btn_t2.pack(side="right", padx=4)
-
-            btn_time = ctk.CTkButton(
-                row, text="Sett tidspunkt",
-                command=lambda i=idx: self.set_group_match_time(i)
-            )
-            btn_time.pack(side="right", padx=4)
-
-            # Rediger/angre vises kun når kampen er spilt
-            if match.get("played"):
-                ctk.CTkButton(
-                    row, text="Rediger resultat",
-                    command=lambda i=idx: self.edit_group_result(i)
-                ).pack(side="right", padx=4)
-
-                ctk.CTkButton(
-                    row, text="Angre resultat",
-                    command=lambda i=idx: self.clear_group_result(i)
-                ).pack(side="right", padx=4)
-
-                # Deaktiver innsending av nytt resultat på samme kamp
-                btn_t1.configure(state="disabled")
-                btn_t2.configure(state="disabled")
-                btn_time.configure(state="disabled")
-
-
-        update_standings_btn = ctk.CTkButton(self.match_controls_frame, text="Oppdater tabell",
+        update_standings_btn = ctk.CTkButton(self.match_actions_frame, text="Oppdater tabell",
                                             command=lambda: self.bracket_canvas.show_group_stage(self.group_stage_model))
-        update_standings_btn.pack(pady=10)
+        update_standings_btn.pack(side="left", padx=5)
+
+        ctk.CTkButton(self.match_actions_frame, text="Importer resultater...",
+                      command=self.import_group_results).pack(side="left", padx=5)
+
+        if self.swiss_switch:
+            ctk.CTkButton(self.match_actions_frame, text="Neste Swiss-runde",
+                          command=self.next_swiss_round).pack(side="left", padx=5)
+
+        if isinstance(self.group_stage_model, PooledGroupStage):
+            ctk.CTkButton(self.match_actions_frame, text="Neste gruppeside",
+                          command=lambda: self.bracket_canvas.next_pool_page(self.group_stage_model)).pack(side="left", padx=5)
+
+        # Rad 0 er overskriften, rad i + 1 er kamp i
+        self.match_list_mode = "group"
+        self.match_list.set_rows(len(self.group_stage_model.matches) + 1, self._group_row_spec)
+
+    def refresh_group_match_control(self, match_index):
+        self.match_list.refresh_row(match_index + 1)
+
+    def _group_row_spec(self, row):
+        if row == 0:
+            return {"text": "Gruppespillkontroller", "header": True, "buttons": []}
+        idx = row - 1
+        match = self.group_stage_model.matches[idx]
+
+        t1 = match['team1'].name
+        t2 = match['team2'].name
+        label = f"{t1} vs {t2}"
+        if "pool" in match:
+            label = f"{self.group_stage_model.pool_names[match['pool']]}: {label}"
+
+        # Knappene vises alltid, men deaktiveres hvis kampen er spilt
+        state = "disabled" if match.get("played") else "normal"
+        buttons = [
+            (f"{t1} vant", lambda: self.set_group_winner_popup(idx, 1), state),
+            (f"{t2} vant", lambda: self.set_group_winner_popup(idx, 2), state),
+            ("Sett tidspunkt", lambda: self.set_group_match_time(idx), state),
+        ]
+        # Rediger/angre vises kun når kampen er spilt
+        if match.get("played"):
+            buttons.append(("Rediger resultat", lambda: self.edit_group_result(idx), "normal"))
+            buttons.append(("Angre resultat", lambda: self.clear_group_result(idx), "normal"))
+        return {"text": label, "buttons": buttons}
+
+    def next_swiss_round(self):
+        if not self.group_stage_model.round_finished():
+            err = ctk.CTkToplevel(self)
+            err.title("Runden er ikke ferdig")
+            ctk.CTkLabel(err, text="Alle kamper i runden må ha resultat\nfør neste runde settes opp.").pack(padx=20, pady=20)
+            self._place_dialog_over(err, width=320, height=120)
+            return
+        self.group_stage_model.pair_next_round()
+
+    def import_group_results(self):
+        """Dialog for å lime inn eller laste mange resultater; alt føres samlet eller ingenting."""
+        top = ctk.CTkToplevel(self)
+        top.title("Importer resultater")
+        self._place_dialog_over(top, width=520, height=460)
+
+        ctk.CTkLabel(top, text="Én kamp per linje: lag 1, lag 2, kopper igjen 1, kopper igjen 2[, vinner]").pack(pady=(10, 4))
+        text = tk.Text(top, height=14, width=60)
+        text.pack(padx=10, pady=4, fill="both", expand=True)
+
+        err_lbl = ctk.CTkLabel(top, text="", text_color="tomato", justify="left")
+        err_lbl.pack(pady=4)
+
+        def load_file():
+            from tkinter import filedialog as fd
+            path = fd.askopenfilename(title="Velg resultatfil",
+                                      filetypes=[("Tekst/CSV", ".txt .csv .tsv"), ("Alle filer", "*.*")])
+            if path:
+                with open(path, "r", encoding="utf-8-sig") as f:
+                    text.delete("1.0", "end")
+                    text.insert("1.0", f.read())
+
+        def do_import():
+            try:
+                results = parse_results(text.get("1.0", "end"), self.group_stage_model.matches)
+                self.group_stage_model.apply_results(results)
+            except ValueError as e:
+                lines = str(e).splitlines()
+                more = f"\n… og {len(lines) - 8} til" if len(lines) > 8 else ""
+                err_lbl.configure(text="\n".join(lines[:8]) + more)
+                return
+            top.destroy()
+
+        btn_row = ctk.CTkFrame(top)
+        btn_row.pack(pady=10)
+        ctk.CTkButton(btn_row, text="Fra fil...", command=load_file).pack(side="left", padx=6)
+        ctk.CTkButton(btn_row, text="Avbryt", command=top.destroy).pack(side="left", padx=6)
+        ctk.CTkButton(btn_row, text="Importer", command=do_import).pack(side="left", padx=6)
+        top.bind("<Escape>", lambda _e: top.destroy())
+        top.grab_set()
+        text.focus()
 
     def edit_group_result(self, match_index):
         match = self.group_stage_model.matches[match_index]
@@ -748,8 +1004,8 @@ class ControlWindow(ctk.CTkToplevel):
         top.title("Rediger resultat")
         self._place_dialog_over(top, width=320, height = 300)
 
-        t1 = match['team1']['name']
-        t2 = match['team2']['name']
+        t1 = match['team1'].name
+        t2 = match['team2'].name
         prev_c1 = match.get("team1_cups_left") or 0
         prev_c2 = match.get("team2_cups_left") or 0
         prev_w  = match.get("winner") or 1
@@ -774,8 +1030,6 @@ class ControlWindow(ctk.CTkToplevel):
                 self.check_allowed_cup_number(c1)
                 self.check_allowed_cup_number(c2)
                 self.group_stage_model.update_match_result(match_index, c1, c2, winner_var.get())
-                self.bracket_canvas.show_group_stage(self.group_stage_model)
-                self.draw_group_match_controls()  # oppdatér knapper (deaktiver “vant”)
                 top.destroy()
             except Exception:
                 err_lbl.configure(text="Ugyldig antall/kombo. Prøv igjen.")
@@ -789,8 +1043,6 @@ class ControlWindow(ctk.CTkToplevel):
 
     def clear_group_result(self, match_index):
         self.group_stage_model.clear_match_result(match_index)
-        self.bracket_canvas.show_group_stage(self.group_stage_model)
-        self.draw_group_match_controls()  # aktiver “vant”-knappene igjen
 
     
     def set_group_match_result(self, match_index):
@@ -807,7 +1059,7 @@ class ControlWindow(ctk.CTkToplevel):
         popup = ctk.CTkInputDialog(title="Sett tidspunkt", text="Tidspunkt (HH:MM)")
         time = popup.get_input()
         if time:
-            self.group_stage_model.matches[match_index]["time"] = time
+            self.group_stage_model.set_match_time(match_index, time)
 
     def show_standings(self):
         standings_window = ctk.CTkToplevel(self)
@@ -818,21 +1070,20 @@ class ControlWindow(ctk.CTkToplevel):
             frame = ctk.CTkFrame(standings_window)
             frame.pack(fill="x", pady=2, padx=10)
 
-            if team["logo"]:
-                img = Image.open(team["logo"])
-                img.thumbnail((40, 40), Image.LANCZOS)
-                logo_img = ImageTk.PhotoImage(img)
+            logo_img = logo_cache.get(team.logo, (40, 40))
+            if logo_img:
                 logo_label = ctk.CTkLabel(frame, image=logo_img, text="")
                 logo_label.image = logo_img
                 logo_label.pack(side="left", padx=10)
+            elif logo_cache.pending(team.logo):
+                # Plassholder så raden ikke hopper når logoen ikke er klar ennå
+                ctk.CTkLabel(frame, text="", width=40).pack(side="left", padx=10)
 
-            stats = (f"{idx}. {team['name']} | Wins: {team['wins']} | "
-                    f"Hit: {team['cups_hit']} | Diff: {team['total_cups_diff']}")
+            stats = (f"{idx}. {team.name} | Wins: {team.wins} | "
+                    f"Hit: {team.cups_hit} | Diff: {team.total_cups_diff}")
 
             ctk.CTkLabel(frame, text=stats, font=("Helvetica", 16)).pack(side="left")
 
-    import sys
-
     def _place_dialog_over(self, top, width=None, height=None):
         """Plasser Toplevel 'top' over dette vinduet (self) – riktig skjerm, riktig z-order."""
         top.update_idletasks()
@@ -936,72 +1187,67 @@ class ControlWindow(ctk.CTkToplevel):
         
         logo_path = False
         for name in team_names:
+            name = name.strip()
+            if not name:
+                continue
             if self.logo_switch:
+                from tkinter import filedialog as fd
                 logo_path = fd.askopenfilename(title=f"Velg logo for {name}", filetypes=[("Image files", ".png .jpg .jpeg .gif")])
-            self.teams.append({"name": name, "logo": logo_path if logo_path else None})
+            team = Team.intern(name, logo_path if logo_path else None)
+            if team not in self.teams:
+                self.teams.append(team)
+        logo_cache.prefetch(t.logo for t in self.teams)
 
     def build_bracket(self):
         # Hvis vi ikke har lastet lag fra fil, les fra tekstboksen (og ev. spør om logo)
         if not self.teams:
             self.fill_team_list()
 
-        # Bygg turnering med bare navn (som før)
-        self.tournament_model.build_bracket([team["name"] for team in self.teams])
-
-        # Koble logoer til de shufflade teamene ETTER bygging – ved navn (ikke indeks)
-        logo_by_name = {t["name"]: t.get("logo") for t in self.teams}
-        for t in self.tournament_model.teams:
-            t["logo"] = logo_by_name.get(t["name"])
-
-        self.draw_match_controls()
-        self.bracket_canvas.refresh()
+        # Lagene deles med modellen, så logoene følger med
+        self.tournament_model.build_bracket(self.teams)
 
 
 
 
     def draw_match_controls(self):
-        for widget in self.match_controls_frame.winfo_children():
+        for widget in self.match_actions_frame.winfo_children():
             widget.destroy()
-        rounds = self.tournament_model.get_rounds()
-        for r, matches in enumerate(rounds):
-            round_label = ctk.CTkLabel(self.match_controls_frame, text=f"Runde {r+1} Kontroller")
-            round_label.pack(pady=5)
-            for mi, match in enumerate(matches):
-                frame = ctk.CTkFrame(self.match_controls_frame)
-                frame.pack(pady=5, fill="x")
-                team1 = match["team1"]['name'] if match["team1"] else "TBD"
-                team2 = match["team2"]['name'] if match["team2"] else "TBD"
-                info_label = ctk.CTkLabel(frame, text=f"Kamp {mi+1}: {team1} vs {team2}")
-                info_label.pack(side="left", padx=5)
-                if match["winner"]:
-                    btn1 = ctk.CTkButton(frame, text=team1, state="disabled")
-                    btn2 = ctk.CTkButton(frame, text=team2, state="disabled")
-                else:
-                    btn1 = ctk.CTkButton(frame, text=team1, command=lambda r=r, mi=mi, t=team1: self.set_winner(r, mi, t))
-                    btn2 = ctk.CTkButton(frame, text=team2, command=lambda r=r, mi=mi, t=team2: self.set_winner(r, mi, t))
-
-                start_time = match["start_time"] if match["start_time"] else "Ikke satt"
-                btn_time = ctk.CTkButton(frame, text=f"Sett starttid ({start_time})", command=lambda r=r, mi=mi: self.set_start_time(r, mi))
-                btn_time.pack(side="right", padx=5)
-                btn_edit = ctk.CTkButton(frame, text="Rediger", command=lambda r=r, mi=mi: self.edit_match(r, mi))
-                btn_edit.pack(side="right", padx=5)
-
-                btn2.pack(side="right", padx=5)
-                btn1.pack(side="right", padx=5)
-
-    def set_winner(self, round_index, match_index, winner_name):
-        match = self.tournament_model.rounds[round_index][match_index]
-
-        if match["team1"] and match["team1"]["name"] == winner_name:
-            winner = match["team1"]
-        elif match["team2"] and match["team2"]["name"] == winner_name:
-            winner = match["team2"]
-        else:
-            winner = {"name": winner_name, "logo": None}
-
-        self.tournament_model.set_winner(round_index, match_index, winner)
-        self.draw_match_controls()
-        self.bracket_canvas.refresh()
+        # Én overskriftsrad per runde, fulgt av rundens kamper
+        self._knockout_rows = []
+        self._knockout_row_of = {}
+        for r, matches in enumerate(self.tournament_model.get_rounds()):
+            self._knockout_rows.append((r, None))
+            for mi in range(len(matches)):
+                self._knockout_row_of[(r, mi)] = len(self._knockout_rows)
+                self._knockout_rows.append((r, mi))
+        self.match_list_mode = "knockout"
+        self.match_list.set_rows(len(self._knockout_rows), self._knockout_row_spec)
+
+    def refresh_match_controls(self, changed):
+        for key in changed:
+            self.match_list.refresh_row(self._knockout_row_of[key])
+
+    def _knockout_row_spec(self, row):
+        r, mi = self._knockout_rows[row]
+        if mi is None:
+            return {"text": f"Runde {r+1} Kontroller", "header": True, "buttons": []}
+        match = self.tournament_model.get_rounds()[r][mi]
+        team1 = match["team1"].name if match["team1"] else "TBD"
+        team2 = match["team2"].name if match["team2"] else "TBD"
+        state = "disabled" if match["winner"] else "normal"
+        start_time = match["start_time"] if match["start_time"] else "Ikke satt"
+        return {"text": f"Kamp {mi+1}: {team1} vs {team2}", "buttons": [
+            (f"Sett starttid ({start_time})", lambda: self.set_start_time(r, mi), "normal"),
+            ("Rediger", lambda: self.edit_match(r, mi), "normal"),
+            (team2, lambda: self.set_winner(r, mi, 2), state),
+            (team1, lambda: self.set_winner(r, mi, 1), state),
+        ]}
+
+    def set_winner(self, round_index, match_index, slot):
+        winner_id = self.tournament_model.team_id(round_index, match_index, slot)
+        if winner_id < 0:
+            return
+        self.tournament_model.set_winner(round_index, match_index, winner_id)
 
 
     def set_start_time(self, round_index, match_index):
@@ -1021,15 +1267,13 @@ class ControlWindow(ctk.CTkToplevel):
                     new_time = new_time[:2] + ':' + new_time[2:]
             
             self.tournament_model.set_start_time(round_index, match_index, new_time)
-            self.draw_match_controls()
-            self.bracket_canvas.refresh()
 
     def edit_match(self, round_index, match_index):
         edit_window = ctk.CTkToplevel(self)
         edit_window.title("Rediger kamp")
         match = self.tournament_model.get_rounds()[round_index][match_index]
-        team1_current = match["team1"] if match["team1"] is not None else ""
-        team2_current = match["team2"] if match["team2"] is not None else ""
+        team1_current = match["team1"].name if match["team1"] is not None else ""
+        team2_current = match["team2"].name if match["team2"] is not None else ""
         
         label1 = ctk.CTkLabel(edit_window, text="Lag 1:")
         label1.pack(pady=5)
@@ -1048,8 +1292,6 @@ class ControlWindow(ctk.CTkToplevel):
             new_team2 = entry2.get().strip() or "TBD"
             self.tournament_model.set_match_teams(round_index, match_index, new_team1, new_team2)
             edit_window.destroy()
-            self.draw_match_controls()
-            self.bracket_canvas.refresh()
         
         save_button = ctk.CTkButton(edit_window, text="Lagre", command=save_edits)
         save_button.pack(pady=10)
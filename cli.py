@@ -0,0 +1,180 @@
+"""
+Kjører en hel turnering fra filer, uten GUI:
+
+    python cli.py Teams/lag.csv -r resultater.csv --seed 1 --top 4 -k sluttspill.csv
+
+Gruppespillet settes opp (samme seed gir samme oppsett som i programmet), resultatene
+føres, tabellen regnes ut, og de beste lagene seedes inn i sluttspillet. Tabell og brakett
+skrives som JSON til skjermen, eller til .json/.csv-filer med --standings-out/--bracket-out.
+Med --expect sammenlignes resultatet med en tidligere kjøring (0 = likt, 1 = ulikt, 2 = feil),
+så gamle turneringer kan spilles av og kontrolleres i en batch-jobb.
+"""
+import argparse
+import csv
+import json
+import random
+import sys
+
+from engine import (GroupStageModel, PooledGroupStage, TournamentModel,
+                    apply_knockout_results, parse_results, parse_team_file)
+
+
+def run_group_stage(teams, results_text, pools=1, rounds=2, swiss=False, seed=None):
+    """Setter opp gruppespillet og fører resultatene. Returnerer modellen."""
+    if pools > 1:
+        group = PooledGroupStage(teams, pools, seed=seed)
+        group.generate_matches(rounds=1 if swiss else rounds)
+    else:
+        group = GroupStageModel(teams)
+        max_rounds = len(teams) - 1 + len(teams) % 2
+        group.generate_matches(rounds=1 if swiss else min(rounds, max_rounds), seed=seed)
+    if not results_text:
+        return group
+
+    pending = results_text
+    while True:
+        # Swiss: resultater for runder som ikke er satt opp ennå, tas med i neste runde
+        leftover = [] if swiss else None
+        group.apply_results(parse_results(pending, group.matches, leftover))
+        if not leftover:
+            break
+        if not group.round_finished():
+            raise ValueError("Resultater for neste Swiss-runde, men runden er ikke ferdigspilt:\n"
+                             + "\n".join(leftover))
+        group.pair_next_round()
+        pending = "\n".join(leftover)
+    return group
+
+
+def run_knockout(standings, top, results_text=None, seed=None):
+    """Seeder de top beste lagene inn i braketten og fører sluttspillresultatene."""
+    model = TournamentModel()
+    model.build_bracket(standings[:top], seed=seed)
+    model.advance_byes()
+    if results_text:
+        apply_knockout_results(model, results_text)
+    return model
+
+
+def standings_rows(group):
+    pool_of = {}
+    for name, pool in zip(getattr(group, "pool_names", ()), getattr(group, "pools", ())):
+        for team in pool.teams:
+            pool_of[team.id] = name
+    return [{"place": place, "team": team.name, "pool": pool_of.get(team.id),
+             "wins": team.wins, "cups_hit": team.cups_hit, "cups_missed": team.cups_missed,
+             "cups_diff": team.total_cups_diff}
+            for place, team in enumerate(group.standings(), start=1)]
+
+
+def match_rows(group):
+    return [{"round": match["round"] + 1, "team1": match["team1"].name, "team2": match["team2"].name,
+             "team1_cups_left": match["team1_cups_left"], "team2_cups_left": match["team2_cups_left"],
+             "winner": match["winner"], "played": match["played"]}
+            for match in group.matches]
+
+
+def bracket_rows(model):
+    def name(team_id):
+        return model.team_by_id(team_id).name if team_id >= 0 else None
+
+    rows = []
+    for r in range(model.num_rounds):
+        for i in range(1 << (model.num_rounds - 1 - r)):
+            node = model.node(r, i)
+            rows.append({"round": r + 1, "match": i + 1, "team1": name(model.team1_ids[node]),
+                         "team2": name(model.team2_ids[node]), "winner": name(model.winner_ids[node])})
+    return rows
+
+
+def write_rows(path, rows):
+    """Skriver radene som CSV eller JSON, etter filendelsen."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else [])
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+
+
+def read_text(path):
+    if path is None:
+        return None
+    with open(path, encoding="utf-8-sig") as f:
+        return f.read()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Kjør en beerpong-turnering fra filer, uten GUI.")
+    parser.add_argument("teams", help="lagfil (samme format som 'Last lag fra fil')")
+    parser.add_argument("-r", "--results", help="resultater fra gruppespillet (lag 1, lag 2, kopper igjen 1, kopper igjen 2[, vinner])")
+    parser.add_argument("-k", "--knockout-results", help="resultater fra sluttspillet, i spillerekkefølge")
+    parser.add_argument("--pools", type=int, default=1, help="antall grupper (standard 1)")
+    parser.add_argument("--rounds", type=int, default=2, help="antall runder i gruppespillet (standard 2)")
+    parser.add_argument("--swiss", action="store_true", help="Swiss-system: nye runder settes opp etter tabellen")
+    parser.add_argument("--top", type=int, default=4, help="antall lag til sluttspillet (0 = ikke sluttspill)")
+    parser.add_argument("--seed", type=int, help="seed for trekningen (oppgi for å kunne gjenta kjøringen)")
+    parser.add_argument("--standings-out", help="skriv tabellen til .json eller .csv")
+    parser.add_argument("--bracket-out", help="skriv braketten til .json eller .csv")
+    parser.add_argument("--expect", help="JSON fra en tidligere kjøring; avslutter med 1 hvis resultatet er ulikt")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    seed = args.seed if args.seed is not None else random.randrange(2**32)
+
+    try:
+        teams = parse_team_file(args.teams)
+        if len(teams) < 2:
+            raise ValueError("Trenger minst to lag.")
+        group = run_group_stage(teams, read_text(args.results), pools=args.pools, rounds=args.rounds,
+                                swiss=args.swiss, seed=seed)
+        standings = list(group.standings())
+
+        # Sluttspillet seedes først når hele gruppespillet er spilt
+        bracket = None
+        if args.top >= 2 and all(match["played"] for match in group.matches):
+            bracket = run_knockout(standings, min(args.top, len(standings)),
+                                   read_text(args.knockout_results), seed=seed)
+        elif args.knockout_results:
+            raise ValueError("Sluttspillresultater oppgitt, men gruppespillet er ikke ferdig.")
+    except (OSError, ValueError) as e:
+        print(f"Feil: {e}", file=sys.stderr)
+        return 2
+
+    document = {
+        "seed": seed,
+        "teams": [team.name for team in teams],
+        "group_matches": match_rows(group),
+        "standings": standings_rows(group),
+        "bracket": None,
+    }
+    if bracket is not None:
+        champion = bracket.winner_ids[1] if bracket.num_rounds else -1
+        document["bracket"] = {
+            "seed": bracket.seed,
+            "matches": bracket_rows(bracket),
+            "champion": bracket.team_by_id(champion).name if champion >= 0 else None,
+        }
+
+    if args.standings_out:
+        write_rows(args.standings_out, document["standings"])
+    if args.bracket_out:
+        write_rows(args.bracket_out, document["bracket"]["matches"] if bracket is not None else [])
+    if not (args.standings_out or args.bracket_out or args.expect):
+        print(json.dumps(document, ensure_ascii=False, indent=2))
+
+    if args.expect:
+        with open(args.expect, encoding="utf-8") as f:
+            expected = json.load(f)
+        if expected != document:
+            print(f"Resultatet avviker fra {args.expect}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
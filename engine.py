@@ -0,0 +1,1284 @@
+"""
+Turneringsmotoren: lag, brakett, gruppespill, angrehistorikk, journal og resultatimport.
+Bruker bare standardbiblioteket, så den kan importeres av skript, tester og
+kommandolinjeverktøy uten Tk, Pillow eller skjerm. GUI-et ligger i brackets.py.
+"""
+import os
+import random
+import bisect
+from array import array
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+from perf import timed
+
+
+class ChangeNotifier:
+    """
+    Enkel observer for modellene. Hver endring sendes som (type, nøkkel, felter),
+    f.eks. ("match", (runde, kamp), {"winner"}). Abonnenter får en liste med hendelser.
+    Inne i en batch() samles alt og leveres som én liste når batchen avsluttes.
+
+    recorder kan settes til en funksjon recorder(operasjon, argumenter) som får hver
+    vellykket endring med argumentene som trengs for å gjenta den (brukes av journalen).
+    history kan settes til en UndoHistory som får motstykket til hver endring.
+    """
+    def __init__(self):
+        self._subscribers = []
+        self._batch_depth = 0
+        self._batched = []
+        self.recorder = None
+        self.history = None
+
+    def subscribe(self, callback):
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    @contextmanager
+    def batch(self):
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._batched:
+                events, self._batched = self._batched, []
+                self._deliver(events)
+
+    def _emit(self, kind, key=None, fields=()):
+        event = (kind, key, frozenset(fields))
+        if self._batch_depth:
+            self._batched.append(event)
+        else:
+            self._deliver([event])
+
+    def _deliver(self, events):
+        for callback in list(self._subscribers):
+            callback(events)
+
+    def _record(self, op, *args):
+        if self.recorder is not None:
+            self.recorder(op, args)
+
+    def _push_undo(self, label, undo, redo):
+        if self.history is not None:
+            self.history.push(label, undo, redo)
+
+    def _undo_transaction(self, label):
+        return self.history.transaction(label) if self.history is not None else nullcontext()
+
+
+class UndoHistory:
+    """
+    Angre/gjør om med kommandoer: hver endring legger igjen et motstykke (undo) og en
+    måte å gjøre den igjen på (redo). Begge er vanlige, små modellkall, så et angre koster
+    like lite som endringen selv, og visningene oppdaterer bare kampene som ble berørt.
+    Endringer som skjer mens et angre/gjør om kjører, registreres ikke på nytt.
+    """
+    def __init__(self, limit=500):
+        self._undo = deque(maxlen=limit)  # (navn, undo, redo)
+        self._redo = []
+        self._applying = False
+        self._open = []  # åpne transaksjoner, hver en liste med kommandoer
+        self.on_change = None  # kalles når det som kan angres/gjøres om har endret seg
+
+    def push(self, label, undo, redo):
+        if self._applying:
+            return
+        if self._open:
+            self._open[-1].append((label, undo, redo))
+            return
+        self._undo.append((label, undo, redo))
+        self._redo.clear()
+        self._changed()
+
+    @contextmanager
+    def transaction(self, label):
+        """Samler alle endringer i blokken til én kommando (f.eks. en hel resultatimport)."""
+        self._open.append([])
+        try:
+            yield
+        finally:
+            commands = self._open.pop()
+            if commands:
+                def undo():
+                    for _, command_undo, _ in reversed(commands):
+                        command_undo()
+
+                def redo():
+                    for _, _, command_redo in commands:
+                        command_redo()
+                self.push(label, undo, redo)
+
+    def undo(self):
+        """Angrer siste endring. Returnerer navnet på den, eller None hvis det ikke var noe å angre."""
+        if not self._undo:
+            return None
+        command = self._undo.pop()
+        self._run(command[1])
+        self._redo.append(command)
+        self._changed()
+        return command[0]
+
+    def redo(self):
+        if not self._redo:
+            return None
+        command = self._redo.pop()
+        self._run(command[2])
+        self._undo.append(command)
+        self._changed()
+        return command[0]
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo_label(self):
+        return self._undo[-1][0] if self._undo else None
+
+    def redo_label(self):
+        return self._redo[-1][0] if self._redo else None
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._changed()
+
+    def _run(self, action):
+        self._applying = True
+        try:
+            action()
+        finally:
+            self._applying = False
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+
+class Team:
+    """
+    Ett lag. Hvert lagnavn internes til ett Team-objekt med fast heltalls-id, som deles
+    av kontrollvinduet, gruppespillet og braketten. Lag sammenlignes på identitet.
+    """
+    __slots__ = ("id", "name", "logo", "wins", "cups_hit", "cups_missed", "total_cups_diff")
+
+    _by_name = {}
+    _by_id = []
+    recorder = None  # som ChangeNotifier.recorder: får ("intern", (navn, logo)) for nye lag og nye logoer
+
+    def __init__(self, team_id, name, logo=None):
+        self.id = team_id
+        self.name = name
+        self.logo = logo
+        self.reset_stats()
+
+    def __repr__(self):
+        return f"Team({self.id}, {self.name!r})"
+
+    @classmethod
+    def intern(cls, name, logo=None):
+        """Henter laget med dette navnet, eller lager det. En oppgitt logo overskriver den gamle."""
+        team = cls._by_name.get(name)
+        if team is None:
+            team = cls(len(cls._by_id), name, logo)
+            cls._by_name[name] = team
+            cls._by_id.append(team)
+        elif logo is not None and logo != team.logo:
+            team.logo = logo
+        else:
+            return team
+        if cls.recorder is not None:
+            cls.recorder("intern", (name, logo))
+        return team
+
+    @classmethod
+    def by_id(cls, team_id):
+        return cls._by_id[team_id] if team_id >= 0 else None
+
+    @classmethod
+    def registered(cls):
+        """Alle lag i id-rekkefølge."""
+        return list(cls._by_id)
+
+    @classmethod
+    def clear_registry(cls):
+        cls._by_name.clear()
+        cls._by_id.clear()
+
+    def reset_stats(self):
+        self.wins = 0
+        self.cups_hit = 0
+        self.cups_missed = 0
+        self.total_cups_diff = 0
+
+
+def as_team(item):
+    """Gjør et lagnavn, en dict med "name"/"logo" eller et Team om til et internert Team (None hvis tomt navn)."""
+    if isinstance(item, Team):
+        return item
+    if isinstance(item, dict):
+        name = str(item.get("name", "")).strip()
+        logo = item.get("logo")
+    else:
+        name = str(item).strip()
+        logo = None
+    return Team.intern(name, logo) if name else None
+
+
+class _MatchView:
+    """
+    Lesevisning av én kamp i TournamentModel, med samme nøkler som de gamle kamp-dictene
+    ("team1", "team2", "winner", "start_time"). Leser rett fra modellens arrays.
+    """
+    __slots__ = ("_model", "_node")
+
+    def __init__(self, model, node):
+        self._model = model
+        self._node = node
+
+    def __getitem__(self, key):
+        model, node = self._model, self._node
+        if key == "team1":
+            return model.team_by_id(model.team1_ids[node])
+        if key == "team2":
+            return model.team_by_id(model.team2_ids[node])
+        if key == "winner":
+            return model.team_by_id(model.winner_ids[node])
+        if key == "start_time":
+            return model.start_times[node]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class TournamentModel(ChangeNotifier):
+    """
+    Utslagsbrakett lagret som et implisitt binærtre (heap-indeksert) i flate arrays.
+    Finalen er node 1, barna til node k er 2k og 2k + 1, forelderen er k // 2 og
+    motstanderkampen k ^ 1. Lagene lagres som Team.id, -1 betyr tomt.
+    """
+    def __init__(self):
+        super().__init__()
+        self.loaded_teams = []  # [Team, ...]
+        self.teams = []
+        self.seed = None
+        self.num_rounds = 0
+        self.team1_ids = array("i")
+        self.team2_ids = array("i")
+        self.winner_ids = array("i")
+        self.start_times = []
+        self._team_match = {}  # lag-id -> noden laget spiller i nå
+        self._rounds_view = []
+
+    @timed("TournamentModel.build_bracket")
+    def build_bracket(self, teams_input, seed=None):
+        """
+        Bygger braketten fra Team-objekter (eller navn/dicts, som internes). Lagene deles, ikke kopieres.
+        Samme lag og samme seed gir samme brakett.
+        """
+        team_objs = list(dict.fromkeys(team for team in map(as_team, teams_input) if team is not None))
+        previous = self.to_state()
+
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        teams_shuffled = team_objs[:]
+        random.Random(seed).shuffle(teams_shuffled)
+        self.teams = teams_shuffled
+
+        n = len(self.teams)
+        size = 2 if n else 0
+        while size < n:
+            size *= 2
+        self.num_rounds = max(size.bit_length() - 1, 0)
+
+        # Node 0 brukes ikke; nodene size/2 .. size-1 er første runde
+        self.team1_ids = array("i", [-1]) * max(size, 1)
+        self.team2_ids = array("i", [-1]) * max(size, 1)
+        self.winner_ids = array("i", [-1]) * max(size, 1)
+        self.start_times = [None] * max(size, 1)
+        self._team_match = {}
+
+        first = size // 2
+        for position, team in enumerate(self.teams):
+            node = first + position // 2
+            if position % 2 == 0:
+                self.team1_ids[node] = team.id
+            else:
+                self.team2_ids[node] = team.id
+            self._team_match[team.id] = node
+
+        self._build_views()
+        names = [team.name for team in team_objs]
+        self._record("build_bracket", names, seed)
+        self._push_undo("bygg brakett", lambda: self.load_state(previous),
+                        lambda: self.build_bracket(names, seed))
+        self._emit("bracket", fields={"structure"})
+
+    def _build_views(self):
+        self._rounds_view = [[_MatchView(self, (1 << (self.num_rounds - 1 - r)) + i)
+                              for i in range(1 << (self.num_rounds - 1 - r))]
+                             for r in range(self.num_rounds)]
+
+    def to_state(self):
+        """Hele braketten som JSON-vennlige verdier (lagene som Team.id)."""
+        return {"teams": [team.id for team in self.teams], "seed": self.seed, "num_rounds": self.num_rounds,
+                "team1_ids": self.team1_ids.tolist(), "team2_ids": self.team2_ids.tolist(),
+                "winner_ids": self.winner_ids.tolist(), "start_times": list(self.start_times)}
+
+    def load_state(self, state):
+        """Motstykket til to_state. Lagene må finnes i Team-registeret med samme id-er."""
+        self.teams = [Team.by_id(team_id) for team_id in state["teams"]]
+        self.seed = state["seed"]
+        self.num_rounds = state["num_rounds"]
+        self.team1_ids = array("i", state["team1_ids"])
+        self.team2_ids = array("i", state["team2_ids"])
+        self.winner_ids = array("i", state["winner_ids"])
+        self.start_times = list(state["start_times"])
+        # Bladnodene først, så hvert lag ender på den siste kampen det har nådd
+        self._team_match = {}
+        for node in range(len(self.team1_ids) - 1, 0, -1):
+            for team_id in (self.team1_ids[node], self.team2_ids[node]):
+                if team_id >= 0:
+                    self._team_match[team_id] = node
+        self._build_views()
+        self._record("load_state", state)
+        self._emit("bracket", fields={"structure"})
+
+    # ---------- Navigasjon ----------
+
+    def node(self, round_index, match_index):
+        return (1 << (self.num_rounds - 1 - round_index)) + match_index
+
+    def position(self, node):
+        """(runde, kamp) for en node."""
+        depth = node.bit_length() - 1
+        return self.num_rounds - 1 - depth, node - (1 << depth)
+
+    def team_by_id(self, team_id):
+        return Team.by_id(team_id)
+
+    def team_id(self, round_index, match_index, slot):
+        """Id-en til lag 1 eller 2 i en kamp (-1 hvis tomt)."""
+        node = self.node(round_index, match_index)
+        return self.team1_ids[node] if slot == 1 else self.team2_ids[node]
+
+    def current_match(self, team_id):
+        """(runde, kamp) laget spiller i nå, eller None."""
+        node = self._team_match.get(team_id)
+        return self.position(node) if node is not None else None
+
+    # ---------- Endringer ----------
+
+    def _capture(self, nodes, team_ids):
+        """Feltene til nodene og kampen hvert lag står i, i formen restore_matches tar imot."""
+        entries = [[node, self.team1_ids[node], self.team2_ids[node], self.winner_ids[node], self.start_times[node]]
+                   for node in nodes]
+        team_nodes = [[team_id, self._team_match.get(team_id)] for team_id in team_ids if team_id >= 0]
+        return entries, team_nodes
+
+    def restore_matches(self, entries, team_nodes):
+        """Setter noder tilbake til verdier fra _capture (motstykket til set_winner/set_match_teams)."""
+        with self.batch():
+            for node, team1_id, team2_id, winner_id, start_time in entries:
+                self.team1_ids[node] = team1_id
+                self.team2_ids[node] = team2_id
+                self.winner_ids[node] = winner_id
+                self.start_times[node] = start_time
+                self._emit("match", self.position(node), {"team1", "team2", "winner", "start_time"})
+            for team_id, node in team_nodes:
+                if node is None:
+                    self._team_match.pop(team_id, None)
+                else:
+                    self._team_match[team_id] = node
+            self._record("restore_matches", entries, team_nodes)
+
+    @timed("TournamentModel.set_winner")
+    def set_winner(self, round_index, match_index, winner_id):
+        """Setter vinner (lag-id) og flytter vinneren videre. Returnerer kampene som ble endret."""
+        node = self.node(round_index, match_index)
+        parent = node >> 1
+        # Venstre barn går til lag 1 i neste kamp, høyre barn til lag 2
+        slots = self.team2_ids if node & 1 else self.team1_ids
+        old = slots[parent] if parent else -1  # forrige vinner, hvis kampen avgjøres på nytt
+        before = self._capture([node, parent] if parent else [node], [old, winner_id])
+        self.winner_ids[node] = winner_id
+        changed = [(round_index, match_index)]
+        if parent:
+            slots[parent] = winner_id
+            if old >= 0 and old != winner_id and self._team_match.get(old) == parent:
+                # Den gamle vinneren tapte likevel her, så dette er siste kamp laget spilte
+                self._team_match[old] = node
+            if winner_id >= 0:
+                self._team_match[winner_id] = parent
+            changed.append((round_index + 1, match_index // 2))
+        self._record("set_winner", round_index, match_index, winner_id)
+        self._push_undo("sett vinner", lambda: self.restore_matches(*before),
+                        lambda: self.set_winner(round_index, match_index, winner_id))
+        with self.batch():
+            self._emit("match", changed[0], {"winner"})
+            if len(changed) > 1:
+                self._emit("match", changed[1], {"team2" if node & 1 else "team1"})
+        return changed
+
+    def set_start_time(self, round_index, match_index, start_time):
+        node = self.node(round_index, match_index)
+        previous = self.start_times[node]
+        self.start_times[node] = start_time
+        self._record("set_start_time", round_index, match_index, start_time)
+        self._push_undo("starttid", lambda: self.set_start_time(round_index, match_index, previous),
+                        lambda: self.set_start_time(round_index, match_index, start_time))
+        self._emit("match", (round_index, match_index), {"start_time"})
+        return [(round_index, match_index)]
+
+    def set_match_teams(self, round_index, match_index, team1, team2):
+        """Setter lagene i en kamp. team1/team2 kan være Team, lag-id eller lagnavn ("TBD" = tomt)."""
+        node = self.node(round_index, match_index)
+        team1_id, team2_id = self._intern(team1), self._intern(team2)
+        old_ids = (self.team1_ids[node], self.team2_ids[node])
+        before = self._capture([node], [*old_ids, team1_id, team2_id])
+        # Lag som tas ut av kampen, står ikke lenger i noen kamp
+        for team_id in old_ids:
+            if team_id >= 0 and self._team_match.get(team_id) == node:
+                del self._team_match[team_id]
+        self.team1_ids[node] = team1_id
+        self.team2_ids[node] = team2_id
+        self.winner_ids[node] = -1
+        self.start_times[node] = None
+        for team_id in (team1_id, team2_id):
+            if team_id >= 0:
+                self._team_match[team_id] = node
+        self._record("set_match_teams", round_index, match_index, team1_id, team2_id)
+        self._push_undo("rediger kamp", lambda: self.restore_matches(*before),
+                        lambda: self.set_match_teams(round_index, match_index, team1_id, team2_id))
+        self._emit("match", (round_index, match_index), {"team1", "team2", "winner", "start_time"})
+        return [(round_index, match_index)]
+
+    def advance_byes(self):
+        """
+        Sender lag uten motstander videre (når antall lag ikke er en toerpotens).
+        Et tomt sete regnes som bye bare hvis ingen lag kan komme dit (hele grenen under er tom).
+        Returnerer kampene som ble endret.
+        """
+        size = 1 << self.num_rounds if self.num_rounds else 0
+        # Noder med minst ett lag i grenen under seg, regnet nedenfra
+        alive = bytearray(size)
+        for node in range(size - 1, 0, -1):
+            if node >= size // 2:
+                alive[node] = self.team1_ids[node] >= 0 or self.team2_ids[node] >= 0
+            else:
+                alive[node] = alive[2 * node] or alive[2 * node + 1]
+
+        changed = []
+        with self.batch():
+            for r in range(self.num_rounds):
+                for i in range(1 << (self.num_rounds - 1 - r)):
+                    node = self.node(r, i)
+                    team1_id, team2_id = self.team1_ids[node], self.team2_ids[node]
+                    if self.winner_ids[node] >= 0 or (team1_id >= 0) == (team2_id >= 0):
+                        continue
+                    # Lag 1 kommer fra barnet 2k, lag 2 fra 2k + 1
+                    if r == 0 or not alive[2 * node + (1 if team1_id >= 0 else 0)]:
+                        changed += self.set_winner(r, i, team1_id if team1_id >= 0 else team2_id)
+        return changed
+
+    def _intern(self, team):
+        if team is None:
+            return -1
+        if isinstance(team, int):
+            return team
+        if isinstance(team, str) and team.strip() == "TBD":
+            return -1
+        team = as_team(team)
+        return team.id if team is not None else -1
+
+    def get_rounds(self):
+        """Rundene som lister av kampvisninger, runde 0 først (samme form som før)."""
+        return self._rounds_view
+
+    @property
+    def rounds(self):
+        return self._rounds_view
+
+class GroupStageModel(ChangeNotifier):
+    def __init__(self, teams):
+        super().__init__()
+        # Lagene deles med resten av programmet; statistikken nullstilles for et nytt gruppespill
+        self.teams = list(dict.fromkeys(team for team in map(as_team, teams) if team is not None))
+        for team in self.teams:
+            team.reset_stats()
+        self.matches = []
+        self.byes = []  # laget som står over i hver runde (None ved partall)
+        self._opponents = {}  # Team.id -> id-ene til lag det allerede er satt opp mot
+        self.seed = None
+
+        # Tabellen holdes sortert fortløpende. Nøkkelen har lagets nummer sist,
+        # så like lag beholder rekkefølgen fra self.teams (som sorted() ga før).
+        self._seq = {team.id: seq for seq, team in enumerate(self.teams)}
+        self._rank_keys = [self._rank_key(team) for team in self.teams]
+        self._standings = list(self.teams)
+
+    @timed("GroupStageModel.generate_matches")
+    def generate_matches(self, rounds=2, seed=None):
+        """
+        Lager kampoppsett med sirkelmetoden (round robin): ingen møter samme motstander
+        to ganger, og hver kamp regnes ut direkte uten omtrekking.
+        rounds kan være opptil antall lag - 1 (full serie). Ved odde antall lag står
+        ett lag over (bye) hver runde. Samme seed gir samme oppsett.
+        """
+        if seed is None:
+            seed = random.randrange(2**32)
+        previous = self.to_state()
+        self.seed = seed
+        teams_shuffled = self.teams[:]
+        random.Random(seed).shuffle(teams_shuffled)
+
+        # Odde antall: et tomt sete gir bye til den som trekkes mot det
+        if len(teams_shuffled) % 2:
+            teams_shuffled.append(None)
+        n = len(teams_shuffled)
+        if rounds > max(n - 1, 0):
+            raise ValueError(f"Maks {max(n - 1, 0)} runder med {len(self.teams)} lag.")
+
+        # Sete 0 står fast, de andre roterer ett hakk per runde
+        self.matches = []
+        self.byes = []
+        self._opponents = {}
+        for r in range(rounds):
+            bye = None
+            for p in range(n // 2):
+                a = 0 if p == 0 else 1 + (p - 1 + r) % (n - 1)
+                b = 1 + (n - 2 - p + r) % (n - 1)
+                team1, team2 = teams_shuffled[a], teams_shuffled[b]
+                if team1 is None or team2 is None:
+                    bye = team2 if team1 is None else team1
+                    continue
+                self._add_match(team1, team2, r)
+            self.byes.append(bye)
+        self._record("generate_matches", rounds, seed)
+        self._push_undo("kampoppsett", lambda: self.restore_schedule(previous),
+                        lambda: self.generate_matches(rounds, seed))
+        self._emit("schedule", fields={"matches"})
+
+    def restore_schedule(self, state):
+        """
+        Setter kampoppsettet (kamper, resultater, byes og seed) tilbake til to_state().
+        Tabellen røres ikke – generate_matches endrer den heller ikke.
+        """
+        self.seed = state["seed"]
+        self.matches = []
+        self._opponents = {}
+        for team1, team2, round_index, c1, c2, winner, time, played in state["matches"]:
+            self._add_match(Team.by_id(team1), Team.by_id(team2), round_index)
+            self.matches[-1].update(team1_cups_left=c1, team2_cups_left=c2, winner=winner, time=time, played=played)
+        self.byes = [Team.by_id(team_id) for team_id in state["byes"]]
+        self._record("restore_schedule", state)
+        self._emit("schedule", fields={"matches"})
+
+    def _add_match(self, team1, team2, round_index):
+        self.matches.append({"team1": team1, "team2": team2, "round": round_index,
+                             "team1_cups_left": None, "team2_cups_left": None, "winner": None,
+                             "time": None, "played": False})
+        self._opponents.setdefault(team1.id, set()).add(team2.id)
+        self._opponents.setdefault(team2.id, set()).add(team1.id)
+
+    def current_round(self):
+        """Nummeret på siste runde som er satt opp, eller -1 hvis ingen kamper finnes."""
+        return self.matches[-1]["round"] if self.matches else -1
+
+    def round_finished(self):
+        return all(m["played"] for m in self.matches if m["round"] == self.current_round())
+
+    def pair_next_round(self):
+        """
+        Swiss-system: setter opp neste runde ut fra nåværende tabell.
+        Lag med lik plassering møtes, ingen møter samme lag to ganger, og bye går til
+        det lavest plasserte laget som ikke har stått over før.
+        Returnerer indeksene til de nye kampene.
+        """
+        round_index = self.current_round() + 1
+        order = list(self.standings())
+
+        bye = None
+        if len(order) % 2:
+            had_bye = {team.id for team in self.byes if team}
+            bye = next((team for team in reversed(order) if team.id not in had_bye), order[-1])
+            order.remove(bye)
+
+        first_new = len(self.matches)
+        for i, j in self._swiss_pairs(order):
+            self._add_match(order[i], order[j], round_index)
+        self.byes.append(bye)
+        self._record("pair_next_round")
+        self._push_undo("Swiss-runde", self.drop_round, self.pair_next_round)
+        self._emit("schedule", round_index, {"matches"})
+        return list(range(first_new, len(self.matches)))
+
+    def drop_round(self):
+        """Fjerner siste runde fra kampoppsettet (motstykket til pair_next_round). Runden må være uspilt."""
+        round_index = self.current_round()
+        first = len(self.matches)
+        while first and self.matches[first - 1]["round"] == round_index:
+            first -= 1
+        if any(match["played"] for match in self.matches[first:]):
+            raise ValueError("Runden har resultater og kan ikke fjernes.")
+        del self.matches[first:]
+        if self.byes:
+            self.byes.pop()
+        # Bygg motstanderlistene på nytt, så en eventuell omkamp fra før ikke forsvinner
+        self._opponents = {}
+        for match in self.matches:
+            self._opponents.setdefault(match["team1"].id, set()).add(match["team2"].id)
+            self._opponents.setdefault(match["team2"].id, set()).add(match["team1"].id)
+        self._record("drop_round")
+        self._emit("schedule", round_index, {"matches"})
+
+    def _swiss_pairs(self, order, max_steps=20_000):
+        """
+        Parer lagene i order (sortert etter tabell) med dybde-først-søk: øverste ledige lag
+        får nærmeste ledige motstander det ikke har møtt, og søket går bare tilbake når en
+        runde ikke går opp. I praksis er dette lineært. Finnes ingen løsning uten omkamp
+        (eller søket blir for langt), tillates omkamper i stedet for å henge.
+        """
+        n = len(order)
+        ids = [team.id for team in order]
+        opponents = [self._opponents.get(team_id, set()) for team_id in ids]
+
+        allow_rematch = False
+        while True:
+            paired = [False] * n
+            chosen = []  # valgte par (i, j) i rekkefølge, for tilbakesporing
+            i, start_j = 0, 1
+            steps = 0
+            while True:
+                while i < n and paired[i]:
+                    i += 1
+                if i >= n:
+                    return chosen
+                steps += 1
+                j = max(start_j, i + 1)
+                while j < n and (paired[j] or (not allow_rematch and ids[j] in opponents[i])):
+                    j += 1
+                if j < n:
+                    paired[i] = paired[j] = True
+                    chosen.append((i, j))
+                    i, start_j = i + 1, i + 2
+                elif chosen and steps < max_steps:
+                    # Gå tilbake og prøv neste motstander for forrige lag
+                    i, j = chosen.pop()
+                    paired[i] = paired[j] = False
+                    start_j = j + 1
+                else:
+                    break
+            if allow_rematch:
+                raise ValueError("Klarte ikke å sette opp runden.")
+            allow_rematch = True
+
+    @timed("GroupStageModel.update_match_result")
+    def update_match_result(self, match_index, cups_left_team1, cups_left_team2, winner):
+        match = self.matches[match_index]
+        # Valider før noe endres, så en ugyldig kombinasjon ikke etterlater halve endringer
+        self._result_points(cups_left_team1, cups_left_team2, winner)
+        undo = result_inverse(self, match_index)
+
+        # Rull tilbake gammelt resultat hvis kampen var spilt
+        if match.get("played"):
+            prev_c1 = match.get("team1_cups_left")
+            prev_c2 = match.get("team2_cups_left")
+            prev_w  = match.get("winner")
+            if prev_c1 is not None and prev_c2 is not None and prev_w in (1, 2):
+                self._apply_result(match, prev_c1, prev_c2, prev_w, sign=-1)
+
+        # Lagre nytt resultat og påfør
+        match["team1_cups_left"] = cups_left_team1
+        match["team2_cups_left"] = cups_left_team2
+        match["winner"] = winner
+        self._apply_result(match, cups_left_team1, cups_left_team2, winner, sign=+1)
+        match["played"] = True
+        self._record("update_match_result", match_index, cups_left_team1, cups_left_team2, winner)
+        self._push_undo("resultat", undo, lambda: self.update_match_result(
+            match_index, cups_left_team1, cups_left_team2, winner))
+        self._emit_result(match_index)
+
+
+    def standings(self):
+        """Tabellen, sortert på poeng, treff og differanse. Listen eies av modellen – ikke endre den."""
+        return self._standings
+
+    def _rank_key(self, team):
+        return (-team.wins, -team.cups_hit, -team.total_cups_diff, self._seq[team.id])
+
+    def _unrank(self, team):
+        pos = bisect.bisect_left(self._rank_keys, self._rank_key(team))
+        del self._rank_keys[pos]
+        del self._standings[pos]
+
+    def _rerank(self, team):
+        key = self._rank_key(team)
+        pos = bisect.bisect_left(self._rank_keys, key)
+        self._rank_keys.insert(pos, key)
+        self._standings.insert(pos, team)
+
+    def _result_points(self, cups_left_team1, cups_left_team2, winner):
+        """Poeng til (lag 1, lag 2) for et resultat. Kaster ValueError ved ugyldig kombinasjon."""
+        cups_hit_team2 = 10 - cups_left_team1
+        if cups_left_team1 != cups_left_team2:
+            if cups_left_team1 > cups_left_team2 and winner == 1:
+                return 2, 0
+            elif cups_left_team1 < cups_left_team2 and winner == 2:
+                return 0, 2
+            raise ValueError("Ugyldig kombinasjon av kopper/vinner")
+        if winner == 1 and cups_left_team1 == cups_hit_team2:
+            return 2, 1
+        elif winner == 2 and cups_left_team1 == cups_hit_team2:
+            return 1, 2
+        raise ValueError("Ugyldig tie-break kombinasjon")
+
+    def _apply_result(self, match, cups_left_team1, cups_left_team2, winner, sign=+1):
+        """Påfør (sign=+1) eller rull tilbake (sign=-1) et resultat i tabellen."""
+        team1 = match["team1"]
+        team2 = match["team2"]
+
+        points1, points2 = self._result_points(cups_left_team1, cups_left_team2, winner)
+        cups_hit_team1 = 10 - cups_left_team2
+        cups_hit_team2 = 10 - cups_left_team1
+
+        # Ta lagene ut av tabellen før nøklene endres, og sett dem inn igjen på ny plass
+        self._unrank(team1)
+        if team2 is not team1:
+            self._unrank(team2)
+
+        # Poeng
+        team1.wins += points1 * sign
+        team2.wins += points2 * sign
+
+        # Statistikk
+        team1.cups_hit    += cups_hit_team1 * sign
+        team1.cups_missed += cups_hit_team2 * sign
+        team1.total_cups_diff = team1.cups_hit - team1.cups_missed
+
+        team2.cups_hit    += cups_hit_team2 * sign
+        team2.cups_missed += cups_hit_team1 * sign
+        team2.total_cups_diff = team2.cups_hit - team2.cups_missed
+
+        self._rerank(team1)
+        if team2 is not team1:
+            self._rerank(team2)
+
+    def clear_match_result(self, match_index):
+        match = self.matches[match_index]
+        if not match.get("played"):
+            return
+        undo = result_inverse(self, match_index)
+        prev_c1 = match.get("team1_cups_left")
+        prev_c2 = match.get("team2_cups_left")
+        prev_w  = match.get("winner")
+        if prev_c1 is not None and prev_c2 is not None and prev_w in (1, 2):
+            self._apply_result(match, prev_c1, prev_c2, prev_w, sign=-1)
+
+        match["team1_cups_left"] = None
+        match["team2_cups_left"] = None
+        match["winner"] = None
+        match["played"] = False
+        self._record("clear_match_result", match_index)
+        self._push_undo("angre resultat", undo, lambda: self.clear_match_result(match_index))
+        self._emit_result(match_index)
+
+    def _emit_result(self, match_index):
+        match = self.matches[match_index]
+        with self.batch():
+            self._emit("match", match_index, {"result"})
+            self._emit("standings", fields={match["team1"].id, match["team2"].id})
+
+    def set_match_time(self, match_index, time):
+        previous = self.matches[match_index]["time"]
+        self.matches[match_index]["time"] = time
+        self._record("set_match_time", match_index, time)
+        self._push_undo("tidspunkt", lambda: self.set_match_time(match_index, previous),
+                        lambda: self.set_match_time(match_index, time))
+        self._emit("match", match_index, {"time"})
+
+    def to_state(self):
+        """Gruppespillet som JSON-vennlige verdier. Tabellen regnes ut på nytt fra resultatene."""
+        return {"type": "group", "teams": [team.id for team in self.teams], "seed": self.seed,
+                "byes": [team.id if team else -1 for team in self.byes],
+                "matches": [[m["team1"].id, m["team2"].id, m["round"], m["team1_cups_left"],
+                             m["team2_cups_left"], m.get("winner"), m["time"], m["played"]]
+                            for m in self.matches]}
+
+    @classmethod
+    def from_state(cls, state):
+        model = cls([Team.by_id(team_id) for team_id in state["teams"]])
+        model.restore_schedule(state)
+        for match in model.matches:
+            if match["played"]:
+                model._apply_result(match, match["team1_cups_left"], match["team2_cups_left"], match["winner"])
+        return model
+
+    def check_result(self, match_index, cups_left_team1, cups_left_team2, winner):
+        """Kaster ValueError hvis resultatet ikke kan føres på kampen. Endrer ingenting."""
+        if not 0 <= match_index < len(self.matches):
+            raise ValueError(f"Kamp {match_index + 1} finnes ikke")
+        for cups in (cups_left_team1, cups_left_team2):
+            if cups > 10 or cups < 0:
+                raise ValueError(f"Ugyldig antall kopper: {cups}")
+        self._result_points(cups_left_team1, cups_left_team2, winner)
+
+    def apply_results(self, results):
+        """
+        Fører mange resultat på én gang: results er (kampindeks, kopper igjen lag 1,
+        kopper igjen lag 2, vinner). Alle radene valideres før noe endres, så én ugyldig
+        rad gjør at ingenting føres. Endringene sendes som én samlet hendelsesliste.
+        """
+        results = list(results)
+        errors = []
+        for row, (match_index, c1, c2, winner) in enumerate(results, start=1):
+            try:
+                self.check_result(match_index, c1, c2, winner)
+            except ValueError as e:
+                errors.append(f"Rad {row}: {e}")
+        if errors:
+            raise ValueError("\n".join(errors))
+        with self.batch(), self._undo_transaction("resultatimport"):
+            for match_index, c1, c2, winner in results:
+                self.update_match_result(match_index, c1, c2, winner)
+        return len(results)
+
+
+class PooledGroupStage(ChangeNotifier):
+    """
+    Gruppespill delt i flere grupper (pools), hver med egen GroupStageModel,
+    eget kampoppsett og egen tabell. Utad ser den ut som én GroupStageModel:
+    matches er en flat liste over alle gruppenes kamper, og kampindeksene
+    oversettes til (gruppe, kamp) internt.
+    """
+    def __init__(self, teams, num_pools, seed=None):
+        super().__init__()
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        teams_shuffled = list(teams)
+        random.Random(seed).shuffle(teams_shuffled)
+        num_pools = max(1, min(num_pools, len(teams_shuffled) // 2 or 1))
+        self._init_pools([GroupStageModel(teams_shuffled[p::num_pools]) for p in range(num_pools)])
+
+    def _init_pools(self, pools):
+        self.pool_names = [f"Gruppe {chr(ord('A') + p)}" for p in range(len(pools))]
+        self.pools = pools
+        self.teams = [team for pool in self.pools for team in pool.teams]
+        self.matches = []
+        self._match_loc = []  # flat kampindeks -> (gruppe, kampindeks i gruppen)
+        self._flat_index = {}  # (gruppe, kampindeks i gruppen) -> flat kampindeks
+
+        # Hendelser fra gruppene sendes videre med flate kampindekser
+        for p, pool in enumerate(self.pools):
+            pool.subscribe(lambda events, p=p: self._forward(p, events))
+        self._rebuild_matches()
+
+    def to_state(self):
+        return {"type": "pooled", "seed": self.seed, "pools": [pool.to_state() for pool in self.pools]}
+
+    @classmethod
+    def from_state(cls, state):
+        model = cls.__new__(cls)
+        ChangeNotifier.__init__(model)
+        model.seed = state["seed"]
+        model._init_pools([GroupStageModel.from_state(pool) for pool in state["pools"]])
+        return model
+
+    def _forward(self, p, events):
+        with self.batch():
+            for kind, key, fields in events:
+                if kind == "match":
+                    key = self._flat_index.get((p, key))
+                self._emit(kind, key, fields)
+
+    def _rebuild_matches(self):
+        self.matches = []
+        self._match_loc = []
+        self._flat_index = {}
+        for p, pool in enumerate(self.pools):
+            for i, match in enumerate(pool.matches):
+                match["pool"] = p
+                self._flat_index[(p, i)] = len(self.matches)
+                self.matches.append(match)
+                self._match_loc.append((p, i))
+
+    def generate_matches(self, rounds=2):
+        previous = self.to_state()
+        with self.batch():
+            for p, pool in enumerate(self.pools):
+                n = len(pool.teams)
+                pool.generate_matches(rounds=min(rounds, n - 1 + n % 2), seed=self.seed + p)
+            self._rebuild_matches()
+        self._record("generate_matches", rounds)
+        self._push_undo("kampoppsett", lambda: self.restore_schedule(previous),
+                        lambda: self.generate_matches(rounds))
+
+    def restore_schedule(self, state):
+        with self.batch():
+            for pool, pool_state in zip(self.pools, state["pools"]):
+                pool.restore_schedule(pool_state)
+            self._rebuild_matches()
+        self._record("restore_schedule", state)
+
+    def round_finished(self):
+        return all(pool.round_finished() for pool in self.pools)
+
+    def pair_next_round(self):
+        with self.batch():
+            for pool in self.pools:
+                pool.pair_next_round()
+            first_new = len(self.matches)
+            self._rebuild_matches()
+        self._record("pair_next_round")
+        self._push_undo("Swiss-runde", self.drop_round, self.pair_next_round)
+        return list(range(first_new, len(self.matches)))
+
+    def drop_round(self):
+        with self.batch():
+            for pool in self.pools:
+                pool.drop_round()
+            self._rebuild_matches()
+        self._record("drop_round")
+
+    def update_match_result(self, match_index, cups_left_team1, cups_left_team2, winner):
+        p, i = self._match_loc[match_index]
+        undo = result_inverse(self, match_index)
+        self.pools[p].update_match_result(i, cups_left_team1, cups_left_team2, winner)
+        self._record("update_match_result", match_index, cups_left_team1, cups_left_team2, winner)
+        self._push_undo("resultat", undo, lambda: self.update_match_result(
+            match_index, cups_left_team1, cups_left_team2, winner))
+
+    def clear_match_result(self, match_index):
+        if not self.matches[match_index]["played"]:
+            return
+        p, i = self._match_loc[match_index]
+        undo = result_inverse(self, match_index)
+        self.pools[p].clear_match_result(i)
+        self._record("clear_match_result", match_index)
+        self._push_undo("angre resultat", undo, lambda: self.clear_match_result(match_index))
+
+    def set_match_time(self, match_index, time):
+        p, i = self._match_loc[match_index]
+        previous = self.matches[match_index]["time"]
+        self.pools[p].set_match_time(i, time)
+        self._record("set_match_time", match_index, time)
+        self._push_undo("tidspunkt", lambda: self.set_match_time(match_index, previous),
+                        lambda: self.set_match_time(match_index, time))
+
+    def check_result(self, match_index, cups_left_team1, cups_left_team2, winner):
+        if not 0 <= match_index < len(self.matches):
+            raise ValueError(f"Kamp {match_index + 1} finnes ikke")
+        p, i = self._match_loc[match_index]
+        self.pools[p].check_result(i, cups_left_team1, cups_left_team2, winner)
+
+    # Samme validering og samlede hendelser som for én gruppe
+    apply_results = GroupStageModel.apply_results
+
+    def standings(self):
+        """
+        Samlet rangering for videre spill: alle gruppevinnere først, så alle toere osv.
+        Innenfor samme plassering sorteres lagene på poeng, treff og differanse.
+        """
+        ranked = []
+        for pool in self.pools:
+            for place, team in enumerate(pool.standings()):
+                ranked.append(((place, -team.wins, -team.cups_hit, -team.total_cups_diff), team))
+        ranked.sort(key=lambda item: item[0])
+        return [team for _, team in ranked]
+
+
+def result_inverse(model, match_index):
+    """Motstykket til å endre resultatet i en kamp, ut fra hvordan kampen står nå."""
+    match = model.matches[match_index]
+    if match["played"]:
+        previous = (match["team1_cups_left"], match["team2_cups_left"], match["winner"])
+        return lambda: model.update_match_result(match_index, *previous)
+    return lambda: model.clear_match_result(match_index)
+
+
+def group_stage_from_state(state):
+    """Gjenskaper et gruppespill (med eller uten grupper) fra to_state()."""
+    cls = PooledGroupStage if state["type"] == "pooled" else GroupStageModel
+    return cls.from_state(state)
+
+
+class TournamentJournal:
+    """
+    Kobler modellene til en journal.Journal, så turneringen overlever et krasj.
+    Hver vellykket endring skrives som en hendelse med argumentene (og seed) som trengs for
+    å gjenta den, og hver snapshot_every-te hendelse lagres hele tilstanden som snapshot.
+    restore() bygger opp siste tilstand igjen fra snapshot pluss hendelsene etter det.
+    """
+    # Operasjonene som kan spilles av igjen, per modell
+    replayable = {
+        "bracket": {"build_bracket", "set_winner", "set_start_time", "set_match_teams",
+                    "restore_matches", "load_state"},
+        "group": {"generate_matches", "pair_next_round", "update_match_result",
+                  "clear_match_result", "set_match_time", "restore_schedule", "drop_round"},
+    }
+
+    def __init__(self, journal, tournament_model, snapshot_every=500):
+        self.journal = journal
+        self.tournament_model = tournament_model
+        self.group_model = None
+        self.snapshot_every = snapshot_every
+        self._since_snapshot = 0
+        self._replaying = False
+        Team.recorder = lambda op, args: self._record("team", op, args)
+        tournament_model.recorder = lambda op, args: self._record("bracket", op, args)
+
+    def attach_group(self, group_model):
+        """Følg et nytt gruppespill. Startoppsettet lagres, så senere endringer kan spilles av på det."""
+        self._set_group(group_model)
+        self._record("group", "new", (group_model.to_state(),))
+
+    def _set_group(self, group_model):
+        if self.group_model is not None:
+            self.group_model.recorder = None
+        self.group_model = group_model
+        group_model.recorder = lambda op, args: self._record("group", op, args)
+
+    def _record(self, target, op, args):
+        if self._replaying:
+            return
+        self.journal.append({"t": target, "op": op, "a": list(args)})
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def reset(self):
+        """Glemmer den lagrede turneringen, så neste oppstart begynner med blanke ark."""
+        if self.group_model is not None:
+            self.group_model.recorder = None
+            self.group_model = None
+        self.journal.reset()
+        self._since_snapshot = 0
+
+    def state(self):
+        return {"teams": [[team.name, team.logo] for team in Team.registered()],
+                "bracket": self.tournament_model.to_state(),
+                "group": self.group_model.to_state() if self.group_model is not None else None}
+
+    def snapshot(self):
+        self.journal.write_snapshot(self.state())
+        self._since_snapshot = 0
+
+    def restore(self):
+        """Leser inn siste lagrede tilstand. Returnerer gruppespillet (eller None)."""
+        state, records = self.journal.load()
+        self._replaying = True
+        try:
+            with self.tournament_model.batch():
+                if state is not None:
+                    Team.clear_registry()
+                    for name, logo in state["teams"]:
+                        Team.intern(name, logo)
+                    self.tournament_model.load_state(state["bracket"])
+                    if state["group"] is not None:
+                        self._set_group(group_stage_from_state(state["group"]))
+                for record in records:
+                    self._replay(record["t"], record["op"], record["a"])
+        finally:
+            self._replaying = False
+        self._since_snapshot = len(records)
+        return self.group_model
+
+    def _replay(self, target, op, args):
+        if target == "team":
+            Team.intern(*args)
+        elif target == "group" and op == "new":
+            self._set_group(group_stage_from_state(args[0]))
+        elif op in self.replayable.get(target, ()):
+            model = self.tournament_model if target == "bracket" else self.group_model
+            getattr(model, op)(*args)
+        else:
+            raise ValueError(f"Ukjent hendelse i journalen: {target}.{op}")
+
+    def sync(self):
+        self.journal.sync()
+
+    def close(self):
+        """Lagrer et ferskt snapshot ved avslutning, så neste oppstart bare leser én fil."""
+        if self._since_snapshot:
+            self.snapshot()
+        self.journal.close()
+
+
+def split_smart(line: str):
+    """Deler en linje i felt. Prøver CSV først, og faller tilbake på , ; | TAB."""
+    import csv  # csv drar med seg re; lastes først når en fil faktisk leses
+    try:
+        for row in csv.reader([line]):
+            if len(row) > 1:
+                return [s.strip() for s in row]
+    except Exception:
+        pass
+    for delim in [",", ";", "|", "\t"]:
+        if delim in line:
+            return [s.strip() for s in line.split(delim)]
+    return [line.strip()]
+
+
+def parse_team_file(filepath):
+    """Leser fil med lag og valgfrie logostier. Støtter CSV (name,logo) og linjer med , ; | TAB."""
+    teams = []
+    base = os.path.dirname(os.path.abspath(filepath))
+
+    with open(filepath, "r", encoding="utf-8-sig") as f:
+        lines = f.read().splitlines()
+
+    # Hopp over header hvis den ser ut som "name,logo"
+    if lines and ("name" in lines[0].lower() and "logo" in lines[0].lower()):
+        lines = lines[1:]
+
+    for raw in lines:
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = split_smart(line)
+        if len(parts) == 1:
+            name = parts[0]
+            logo = None
+        else:
+            name, logo = parts[0], (parts[1] or None)
+
+        if not name:
+            continue
+
+        # Normaliser/absolutt sti til logo hvis oppgitt
+        if logo:
+            logo = os.path.expanduser(logo)
+            if not os.path.isabs(logo):
+                logo = os.path.realpath(os.path.join(base, logo))
+
+        teams.append(Team.intern(name, logo))
+    return list(dict.fromkeys(teams))
+
+
+def _result_lines(text):
+    """
+    Går gjennom linjene i en resultattekst og gir (linjenummer, linje, felt, feil) per kamp,
+    der felt er (lag 1, lag 2, kopper igjen 1, kopper igjen 2, vinner 1|2) eller None ved feil.
+    Tomme linjer, kommentarer (#) og en overskriftslinje øverst hoppes over.
+    """
+    first = True
+    for line_no, raw in enumerate(text.splitlines(), start=1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = split_smart(line)
+        header, first = first, False
+        if len(parts) not in (4, 5):
+            yield line_no, line, None, "forventet 4 eller 5 felt"
+            continue
+        try:
+            c1, c2 = int(parts[2]), int(parts[3])
+        except ValueError:
+            if not header:
+                yield line_no, line, None, "kopper må være heltall"
+            continue
+
+        winner = parts[4].lower() if len(parts) == 5 else ""
+        if winner in ("1", parts[0].lower()):
+            winner = 1
+        elif winner in ("2", parts[1].lower()):
+            winner = 2
+        elif winner == "":
+            if c1 == c2:
+                yield line_no, line, None, "vinner må oppgis ved lik stilling"
+                continue
+            winner = 1 if c1 > c2 else 2
+        else:
+            yield line_no, line, None, f"ukjent vinner {parts[4]}"
+            continue
+        yield line_no, line, (parts[0], parts[1], c1, c2, winner), None
+
+
+def parse_results(text, matches, leftover=None):
+    """
+    Leser resultater fra CSV eller innlimt tekst, én kamp per linje:
+    lag 1, lag 2, kopper igjen lag 1, kopper igjen lag 2[, vinner]
+    Vinner kan være 1, 2 eller lagnavnet; uten vinner vinner laget med flest kopper igjen.
+    Lagene kan stå i motsatt rekkefølge av kampoppsettet. Returnerer en liste med
+    (kampindeks, kopper igjen lag 1, kopper igjen lag 2, vinner) for apply_results,
+    eller kaster ValueError med alle linjene som ikke kunne leses.
+    Er leftover en liste, legges linjer uten tilhørende kamp der i stedet for å gi feil
+    (f.eks. resultater fra Swiss-runder som ikke er satt opp ennå).
+    """
+    by_pair = {}
+    for idx, match in enumerate(matches):
+        by_pair.setdefault((match["team1"].name.lower(), match["team2"].name.lower()), []).append(idx)
+
+    results = []
+    used = set()
+    errors = []
+    for line_no, line, fields, error in _result_lines(text):
+        if error is not None:
+            errors.append(f"Linje {line_no}: {error}")
+            continue
+        name1, name2, c1, c2, winner = fields
+
+        swapped = False
+        candidates = by_pair.get((name1.lower(), name2.lower()))
+        if candidates is None:
+            candidates = by_pair.get((name2.lower(), name1.lower()))
+            swapped = True
+        # Første uspilte kamp mellom lagene, ellers siste spilte (overskrives)
+        free = [idx for idx in candidates or () if idx not in used]
+        if not free:
+            if leftover is not None:
+                leftover.append(line)
+            elif candidates is None:
+                errors.append(f"Linje {line_no}: ingen kamp mellom {name1} og {name2}")
+            else:
+                errors.append(f"Linje {line_no}: kampen er allerede med i importen")
+            continue
+        idx = next((i for i in free if not matches[i]["played"]), free[-1])
+
+        if swapped:
+            c1, c2, winner = c2, c1, 3 - winner
+        used.add(idx)
+        results.append((idx, c1, c2, winner))
+
+    if errors:
+        raise ValueError("\n".join(errors))
+    return results
+
+
+def apply_knockout_results(tournament_model, text):
+    """
+    Fører sluttspillresultater (samme linjeformat som parse_results) i rekkefølge:
+    kampen finnes ut fra hvor lagene står i braketten nå, og vinneren sendes videre,
+    også forbi kamper uten motstander (se advance_byes).
+    Stopper med ValueError på første linje som ikke passer. Returnerer antall førte kamper.
+    """
+    by_name = {team.name.lower(): team for team in tournament_model.teams}
+    applied = 0
+    for line_no, line, fields, error in _result_lines(text):
+        if error is None:
+            name1, name2, _, _, winner = fields
+            team1, team2 = by_name.get(name1.lower()), by_name.get(name2.lower())
+            position = tournament_model.current_match(team1.id) if team1 and team2 else None
+            if position is None or {team1.id, team2.id} != {tournament_model.team_id(*position, 1),
+                                                            tournament_model.team_id(*position, 2)}:
+                error = f"{name1} og {name2} møtes ikke i braketten nå"
+        if error is not None:
+            raise ValueError(f"Linje {line_no}: {error}")
+        tournament_model.set_winner(*position, (team1 if winner == 1 else team2).id)
+        # Vinneren kan ha fått et sete uten motstander som aldri kommer (bye videre)
+        tournament_model.advance_byes()
+        applied += 1
+    return applied
@@ -0,0 +1,131 @@
+import json
+import os
+import time
+from pathlib import Path
+
+
+class Journal:
+    """
+    Append-only logg over endringer, lagret som én JSON-linje per hendelse, pluss et
+    øyeblikksbilde (snapshot) av hele tilstanden med jevne mellomrom.
+
+    Hver linje skrives til operativsystemet med en gang, så et krasj i programmet
+    mister ingenting. fsync (som tåler strømbrudd) kostes bare én gang per sync_interval
+    sekunder; kall sync() jevnlig, f.eks. fra en after()-løkke, og close() ved avslutning.
+
+    Et snapshot skrives atomisk (tmp-fil + os.replace) og husker sekvensnummeret til
+    siste hendelse det dekker. Deretter tømmes loggen. Ved oppstart gir load() snapshotet
+    og hendelsene etter det, så gjenoppbyggingen blir kort uansett hvor lenge man har holdt på.
+    """
+    journal_name = "journal.jsonl"
+    snapshot_name = "snapshot.json"
+
+    def __init__(self, directory, sync_interval=0.25):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.journal_path = self.directory / self.journal_name
+        self.snapshot_path = self.directory / self.snapshot_name
+        self.sync_interval = sync_interval
+        self.seq = 0            # sekvensnummeret til siste hendelse som er skrevet
+        self.snapshot_seq = 0   # siste hendelse som er dekket av snapshotet
+        self._file = None
+        self._dirty = False
+        self._last_sync = time.monotonic()
+
+    # ---------- Skriving ----------
+
+    def append(self, record):
+        """Legger til en hendelse (dict som kan gjøres om til JSON). Returnerer sekvensnummeret."""
+        if self._file is None:
+            self._file = open(self.journal_path, "a", encoding="utf-8")
+        self.seq += 1
+        self._file.write(json.dumps({"seq": self.seq, **record}, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self._dirty = True
+        if time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+        return self.seq
+
+    def sync(self):
+        """fsync av ventende hendelser. Billig å kalle ofte; gjør ingenting hvis alt er lagret."""
+        if self._dirty and self._file is not None:
+            os.fsync(self._file.fileno())
+            self._dirty = False
+        self._last_sync = time.monotonic()
+
+    def write_snapshot(self, state):
+        """Lagrer hele tilstanden atomisk og starter en tom logg etter den."""
+        tmp = self.snapshot_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"seq": self.seq, "state": state}, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        self.snapshot_seq = self.seq
+
+        # Hendelsene er nå dekket av snapshotet. Krasjer vi før loggen er tømt,
+        # hoppes de over ved neste load() fordi seq <= snapshot_seq.
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.journal_path, "w", encoding="utf-8")
+        os.fsync(self._file.fileno())
+        self._dirty = False
+
+    def reset(self):
+        """Sletter snapshot og logg, f.eks. når en ny turnering startes fra bunnen."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        for path in (self.journal_path, self.snapshot_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        self.seq = self.snapshot_seq = 0
+        self._dirty = False
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    # ---------- Lesing ----------
+
+    def load(self):
+        """
+        Returnerer (tilstand fra snapshot eller None, [hendelser etter snapshotet]).
+        En halvskrevet siste linje (krasj midt i en skriving) ignoreres.
+        """
+        state = None
+        self.snapshot_seq = 0
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            state = snapshot["state"]
+            self.snapshot_seq = snapshot["seq"]
+        except FileNotFoundError:
+            pass
+
+        records = []
+        try:
+            with open(self.journal_path, "rb+") as f:
+                good = 0
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("ufullstendig linje")
+                        record = json.loads(line)
+                    except ValueError:
+                        # Avkuttet linje etter krasj: kutt den bort, ellers ville nye
+                        # hendelser havnet bak en linje som stopper lesingen
+                        f.truncate(good)
+                        break
+                    good += len(line)
+                    if record["seq"] > self.snapshot_seq:
+                        records.append(record)
+        except FileNotFoundError:
+            pass
+
+        self.seq = records[-1]["seq"] if records else self.snapshot_seq
+        return state, records
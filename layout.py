@@ -0,0 +1,127 @@
+from array import array
+from functools import lru_cache
+
+
+class BracketLayout:
+    """
+    Ferdig utregnet geometri for en brakett, lagret i flate arrays.
+
+    Kampene nummereres flatt runde for runde: kamp i i runde r har indeks
+    round_offsets[r] + i. For kamp k ligger boksen i boxes[4k:4k+4] (x0, y0, x1, y1)
+    og senteret i centers[2k:2k+2].
+    Hver kobling (barn -> forelder) er en linje med fire punkter i connectors[8e:8e+8],
+    og edges[3e:3e+3] sier hvilken (runde, kamp, 0|1) den hører til.
+
+    Objektene deles via cachen og må ikke endres av kallende kode.
+    """
+    __slots__ = ("round_sizes", "round_offsets", "boxes", "centers", "connectors", "edges",
+                 "box_width", "box_height")
+
+    def __init__(self, round_sizes, round_offsets, boxes, centers, connectors, edges, box_width, box_height):
+        self.round_sizes = round_sizes
+        self.round_offsets = round_offsets
+        self.boxes = boxes
+        self.centers = centers
+        self.connectors = connectors
+        self.edges = edges
+        self.box_width = box_width
+        self.box_height = box_height
+
+    def center(self, r, i):
+        k = 2 * (self.round_offsets[r] + i)
+        return self.centers[k], self.centers[k + 1]
+
+    def box(self, r, i):
+        k = 4 * (self.round_offsets[r] + i)
+        return tuple(self.boxes[k:k + 4])
+
+
+@lru_cache(maxsize=64)
+def bracket_layout(num_rounds, matches_r0, width, height, box_width=300, box_height=80, margin=50):
+    """
+    Regner ut plasseringen av alle kamper og koblingslinjer i en brakett.
+    Ren funksjon uten Tk – resultatet caches på argumentene, så gjentatte tegninger
+    med samme størrelse koster ingenting.
+    """
+    horizontal_spacing = ((width - 2 * margin - num_rounds * box_width) /
+                          (num_rounds - 1)) if num_rounds > 1 else 0
+    vertical_spacing = ((height - 2 * margin - matches_r0 * box_height) /
+                        (matches_r0 - 1)) if matches_r0 > 1 else 0
+
+    # Antall kamper per runde: hver kamp i neste runde får (opptil) to barn
+    round_sizes = []
+    n = matches_r0
+    for _ in range(num_rounds):
+        round_sizes.append(n)
+        n = max(1, (n + 1) // 2)
+    round_offsets = []
+    total = 0
+    for n in round_sizes:
+        round_offsets.append(total)
+        total += n
+
+    centers = array("d", bytes(16 * total))
+    boxes = array("d", bytes(32 * total))
+    n_edges = total - matches_r0
+    connectors = array("d", bytes(64 * n_edges))
+    edges = array("i", bytes(12 * n_edges))
+
+    half_w = box_width / 2
+    half_h = box_height / 2
+    step_y = box_height + vertical_spacing
+    x = margin + half_w
+    for i in range(matches_r0):
+        centers[2 * i] = x
+        centers[2 * i + 1] = margin + i * step_y + half_h
+
+    e = 0
+    for r in range(1, num_rounds):
+        prev_off = round_offsets[r - 1]
+        prev_n = round_sizes[r - 1]
+        off = round_offsets[r]
+        x = margin + r * (box_width + horizontal_spacing) + half_w
+        parent_x_left = x - half_w
+        mid_x = (x - box_width - horizontal_spacing + half_w + parent_x_left) / 2
+        for i in range(round_sizes[r]):
+            c1 = prev_off + 2 * i
+            if 2 * i + 1 < prev_n:
+                y = (centers[2 * c1 + 1] + centers[2 * c1 + 3]) / 2
+            else:
+                y = centers[2 * c1 + 1]
+            k = off + i
+            centers[2 * k] = x
+            centers[2 * k + 1] = y
+
+            for idx_offset in (0, 1):
+                if 2 * i + idx_offset >= prev_n:
+                    break
+                child = c1 + idx_offset
+                child_x_right = centers[2 * child] + half_w
+                child_y = centers[2 * child + 1]
+                connectors[8 * e:8 * e + 8] = array("d", (child_x_right, child_y, mid_x, child_y,
+                                                          mid_x, y, parent_x_left, y))
+                edges[3 * e:3 * e + 3] = array("i", (r, i, idx_offset))
+                e += 1
+
+    for k in range(total):
+        cx = centers[2 * k]
+        cy = centers[2 * k + 1]
+        boxes[4 * k:4 * k + 4] = array("d", (cx - half_w, cy - half_h, cx + half_w, cy + half_h))
+
+    # Kutt bort ubrukte koblinger hvis en runde hadde odde antall kamper
+    del connectors[8 * e:]
+    del edges[3 * e:]
+
+    return BracketLayout(tuple(round_sizes), tuple(round_offsets), boxes, centers,
+                         connectors, edges, box_width, box_height)
+
+
+if __name__ == "__main__":
+    # Enkel ytelsestest uten skjerm: python layout.py
+    import timeit
+    for teams in (16, 64, 256, 1024):
+        rounds = teams.bit_length() - 1
+        cold = timeit.timeit(lambda: (bracket_layout.cache_clear(),
+                                      bracket_layout(rounds, teams // 2, 1920, 1080)), number=20) / 20
+        warm = timeit.timeit(lambda: bracket_layout(rounds, teams // 2, 1920, 1080), number=1000) / 1000
+        print(f"{teams:5d} lag: {cold * 1e3:7.3f} ms uten cache, {warm * 1e6:6.2f} µs med cache")
@@ -0,0 +1,209 @@
+import os
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import tkinter as tk
+
+from perf import timed
+
+
+class LogoCache:
+    """
+    Delt cache for laglogoer som brukes av alle tegnefunksjonene.
+
+    Fildekoding skjer aldri på Tk-tråden: logoene leses og nedskaleres til et lite
+    kildebilde i en trådpool, og leveres tilbake via en kø som Tk-tråden poller med after().
+    Ferdige ImageTk.PhotoImage lagres per (filsti, målstørrelse, modus, mtime), så en logo
+    skaleres bare én gang per størrelse. mtime hentes med os.stat bare første gang en fil
+    brukes og når logoene hentes på nytt med prefetch(), så tegning rører aldri disken;
+    er fila endret da, leses den på nytt.
+    Eldste bilder kastes ut (LRU) når minnetaket er nådd.
+    Pillow importeres først når den første logoen faktisk skal leses.
+    """
+    source_max_size = 512  # største side på kildebildet som holdes i minnet
+    poll_ms = 30
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, source_max_bytes=64 * 1024 * 1024, workers=None):
+        self.max_bytes = max_bytes
+        self.source_max_bytes = source_max_bytes
+        self.current_bytes = 0
+        self.source_bytes = 0
+        self._photos = OrderedDict()   # (sti, størrelse, modus, mtime) -> (PhotoImage | None, bytes)
+        self._sources = OrderedDict()  # (sti, mtime) -> (PIL.Image | None, bytes)
+        self._pending = set()          # (sti, mtime) som dekodes i bakgrunnen
+        self._mtimes = {}              # sti -> mtime fra siste os.stat (None hvis fila mangler)
+        self._ready = queue.Queue()    # ferdige dekodinger fra arbeidertrådene
+        self._workers = workers or min(4, os.cpu_count() or 1)
+        self._executor = None
+        self._widget = None
+        self._polling = False
+        self._listeners = []
+        self.hits = 0
+        self.misses = 0
+        self.decodes = 0
+        self.evictions = 0
+
+    # ---------- Tk-siden ----------
+
+    def add_listener(self, widget, callback):
+        """Registrer en callback som kalles (på Tk-tråden) når nye logoer er klare."""
+        if self._widget is None:
+            self._widget = widget
+        self._listeners.append(callback)
+
+    def prefetch(self, paths):
+        """Start bakgrunnsdekoding av alle logoene, f.eks. rett etter at lagene er lastet."""
+        for path in paths:
+            if path:
+                src_key = self._stat(path)
+                if src_key not in self._sources:
+                    self._request(src_key)
+
+    def pending(self, path):
+        """True hvis logoen fortsatt dekodes i bakgrunnen."""
+        return bool(path) and self._source_key(path) in self._pending
+
+    @timed("logo_cache.get")
+    def get(self, path, size, mode="fit"):
+        """
+        Returnerer et ferdig ImageTk.PhotoImage for logoen, eller None hvis den ikke er klar
+        (ennå) eller ikke kan leses. Blokkerer aldri på fil-I/O.
+        mode="fit" skalerer proporsjonalt innenfor size (som thumbnail),
+        mode="exact" skalerer til nøyaktig size (som resize).
+        """
+        if not path:
+            return None
+        src_key = self._source_key(path)
+        w, h = size
+        key = (path, (max(int(w), 1), max(int(h), 1)), mode, src_key[1])
+        entry = self._photos.get(key)
+        if entry is not None:
+            self._photos.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        source = self._sources.get(src_key)
+        if source is None:
+            self._request(src_key)
+            return None
+        self._sources.move_to_end(src_key)
+
+        self.misses += 1
+        img = source[0]
+        if img is None:
+            photo, nbytes = None, 0
+        else:
+            from PIL import Image, ImageTk
+            if mode == "exact":
+                img = img.resize(key[1], Image.LANCZOS)
+            else:
+                img = img.copy()
+                img.thumbnail(key[1], Image.LANCZOS)
+            photo = ImageTk.PhotoImage(img)
+            nbytes = img.width * img.height * 4
+
+        self._photos[key] = (photo, nbytes)
+        self.current_bytes += nbytes
+        while self.current_bytes > self.max_bytes and len(self._photos) > 1:
+            _, (_, old_bytes) = self._photos.popitem(last=False)
+            self.current_bytes -= old_bytes
+            self.evictions += 1
+        return photo
+
+    def clear(self):
+        self._photos.clear()
+        self._sources.clear()
+        self._mtimes.clear()
+        self.current_bytes = 0
+        self.source_bytes = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "decodes": self.decodes,
+            "evictions": self.evictions,
+            "entries": len(self._photos),
+            "bytes": self.current_bytes,
+            "sources": len(self._sources),
+            "source_bytes": self.source_bytes,
+            "pending": len(self._pending),
+        }
+
+    def _source_key(self, path):
+        if path not in self._mtimes:
+            return self._stat(path)
+        return (path, self._mtimes[path])
+
+    def _stat(self, path):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        self._mtimes[path] = mtime
+        return (path, mtime)
+
+    def _request(self, src_key):
+        if src_key in self._pending:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="logo")
+        self._pending.add(src_key)
+        self._executor.submit(self._decode, src_key)
+        self._ensure_polling()
+
+    def _ensure_polling(self):
+        if self._polling:
+            return
+        widget = self._widget or tk._default_root
+        if widget is None:
+            return
+        self._polling = True
+        widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        """Kjører på Tk-tråden: flytter ferdige dekodinger inn i cachen og varsler lytterne."""
+        self._polling = False
+        arrived = False
+        while True:
+            try:
+                src_key, img, nbytes = self._ready.get_nowait()
+            except queue.Empty:
+                break
+            self._pending.discard(src_key)
+            self._sources[src_key] = (img, nbytes)
+            self.source_bytes += nbytes
+            self.decodes += 1
+            arrived = True
+        while self.source_bytes > self.source_max_bytes and len(self._sources) > 1:
+            _, (_, old_bytes) = self._sources.popitem(last=False)
+            self.source_bytes -= old_bytes
+            self.evictions += 1
+
+        if self._pending:
+            self._ensure_polling()
+        if arrived:
+            for callback in self._listeners:
+                callback()
+
+    # ---------- Arbeidertrådene ----------
+
+    @timed("logo_cache.decode (tråd)")
+    def _decode(self, src_key):
+        path = src_key[0]
+        try:
+            from PIL import Image
+            img = Image.open(path)
+            img.draft("RGB", (self.source_max_size, self.source_max_size))
+            img.thumbnail((self.source_max_size, self.source_max_size), Image.LANCZOS)
+            img = img.convert("RGBA")
+            nbytes = img.width * img.height * 4
+        except Exception as e:
+            # Husk feilen også, så vi ikke prøver å lese samme fil ved hver tegning
+            print(f"Feil ved lasting av logo: {e}")
+            img, nbytes = None, 0
+        self._ready.put((src_key, img, nbytes))
+
+
+# Én felles cache for hele programmet
+logo_cache = LogoCache()
@@ -1,11 +1,41 @@
-import customtkinter as ctk
-from timer import Timer
-from PIL import Image, ImageTk
-import time
-import sys
-import os
-from brackets import TournamentModel, TournamentBracketCanvas, ControlWindow
-
+from startup import StartupTimer
+startup = StartupTimer()
+
+with startup.phase('import stdlib'):
+    import time
+    import sys
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+    import perf
+    import stall_watchdog
+with startup.phase('import customtkinter'):
+    import customtkinter as ctk
+with startup.phase('import engine/journal'):
+    from engine import TournamentModel, TournamentJournal
+    from journal import Journal
+with startup.phase('import brackets (GUI)'):
+    from brackets import TournamentBracketCanvas, ControlWindow
+with startup.phase('import timer'):
+    from timer import TimerBank, tick_scheduler
+
+# Skriv ut tabellen over oppstartstid med: python main.py --startup-report
+# (eller miljøvariabelen BRACKETS_STARTUP_REPORT=1)
+# Tidsmåling av tegning og modell med overlegg: python main.py --perf (se perf.py)
+SHOW_STARTUP_REPORT = '--startup-report' in sys.argv or bool(os.environ.get('BRACKETS_STARTUP_REPORT'))
+
+
+def arg_value(flag, default):
+    """Verdien etter et flagg på kommandolinjen (f.eks. --tables 8), ellers default."""
+    if flag in sys.argv[:-1]:
+        return sys.argv[sys.argv.index(flag) + 1]
+    return default
+
+
+# Antall bord (timere) ved oppstart: python main.py --tables 8 eller BRACKETS_TABLES=8
+TABLES = int(arg_value('--tables', os.environ.get('BRACKETS_TABLES', 2)))
+# Jevn animasjon av timerbuene med opptil så mange bilder per sekund (0 = av):
+# python main.py --smooth-fps 30 eller BRACKETS_SMOOTH_FPS=30
+SMOOTH_FPS = int(arg_value('--smooth-fps', os.environ.get('BRACKETS_SMOOTH_FPS', 0)))
 
 
 def resource_path(relative_path):
@@ -22,75 +52,145 @@ def resource_path(relative_path):
 def find_time():
     year = str(time.localtime().tm_year)
     month = time.localtime().tm_mon
-    
+
     if month <= 6:
         sem = 'Vår '
     else:
         sem = 'Høst '
-        
+
     return sem + year
 
 
-ctk.set_appearance_mode('dark')
-#ctk.set_default_color_theme('green')
+@perf.timed('decode_logo (tråd)')
+def decode_logo(path, size):
+    """Kjører i en arbeidertråd: leser og skalerer ned logoen (fila er stor)."""
+    from PIL import Image
+    image = Image.open(path)
+    image.draft('RGB', (size * 2, size * 2))
+    image.thumbnail((size * 2, size * 2))  # dobbel størrelse holder også på HiDPI-skjermer
+    image.load()
+    return image
 
 
+def show_logo_when_ready(future, size):
+    if not future.done():
+        root.after(30, show_logo_when_ready, future, size)
+        return
+    try:
+        image = future.result()
+        with startup.phase('logo inn i GUI'):
+            logo = ctk.CTkImage(light_image=image, dark_image=image, size=(size, size))
+            logo_label.configure(image=logo, text='')
+        startup.mark('logo vises')
+    except Exception as e:
+        print(f"Feil ved lasting av logo: {e}")
+    if SHOW_STARTUP_REPORT:
+        print(startup.report())
 
-#root window
-root = ctk.CTk()
-root.title('Beerpong Turnering ' + find_time())
-root.geometry('1920x1280')
 
-#root.state('zoomed')
+def finish_startup():
+    """
+    Alt som ikke trengs for første bilde: kontrollvinduet (med tekstboksen og
+    gjenoppretting fra journalen) bygges og logoen dekodes først når hovedvinduet vises.
+    """
+    global control_window
+    if control_window is not None:
+        return
+    startup.mark('første bilde')
+    root.unbind('<Map>')
 
-#configure grid
-root.columnconfigure(0, weight=1)
-root.columnconfigure(1, weight=100)
-root.rowconfigure(0, weight=1)
+    with startup.phase('kontrollvindu + gjenoppretting'):
+        control_window = ControlWindow(master=main_frame, tournament_model=tournament_model,
+                                       bracket_canvas=bracket_frame, journal=journal)
 
+    future = logo_executor.submit(decode_logo, resource_path('graphics/menageriet_logo.png'), 200)
+    root.after(30, show_logo_when_ready, future, 200)
+    startup.mark('oppstart ferdig')
 
-# left frame timer
-timer_frame = ctk.CTkFrame(master=root)
-timer_frame.grid(row=0, column=0, sticky='nsew', padx=10, pady=10)
 
-# right frame brackets
-main_frame = ctk.CTkFrame(master=root)
-main_frame.grid(row=0, column=1, sticky='nsew', padx=10, pady=10)
+with startup.phase('hovedvindu'):
+    ctk.set_appearance_mode('dark')
+    #ctk.set_default_color_theme('green')
 
+    #root window
+    root = ctk.CTk()
+    root.title('Beerpong Turnering ' + find_time())
+    root.geometry('1920x1280')
 
+    #root.state('zoomed')
 
-# brackets
+    #configure grid
+    root.columnconfigure(0, weight=1)
+    root.columnconfigure(1, weight=100)
+    root.rowconfigure(0, weight=1)
 
-brackets_label = ctk.CTkLabel(master=main_frame, text='Beerpong Turnering '+ find_time(), font=('Arial', 40))
-brackets_label.pack(pady=12, padx=10)
 
-tournament_model = TournamentModel()
+    # left frame timer
+    timer_frame = ctk.CTkFrame(master=root)
+    timer_frame.grid(row=0, column=0, sticky='nsew', padx=10, pady=10)
 
-bracket_frame = TournamentBracketCanvas(master=main_frame, tournament_model=tournament_model)
+    # right frame brackets
+    main_frame = ctk.CTkFrame(master=root)
+    main_frame.grid(row=0, column=1, sticky='nsew', padx=10, pady=10)
 
-control_window = ControlWindow(master=main_frame, tournament_model=tournament_model, bracket_canvas=bracket_frame)
 
 
-# Timer 1
-timer_label = ctk.CTkLabel(master=timer_frame, text='Countdown Timer', font=('Arial', 40))
-timer_label.pack(pady=12, padx=10)
+# brackets
+with startup.phase('brakettvisning'):
+    brackets_label = ctk.CTkLabel(master=main_frame, text='Beerpong Turnering '+ find_time(), font=('Arial', 40))
+    brackets_label.pack(pady=12, padx=10)
 
-timer1 = Timer(master=timer_frame, initial_time=60*15, timer_label='Bord 1')
+    tournament_model = TournamentModel()
 
-timer2 = Timer(master=timer_frame, initial_time=60*15, timer_label='Bord 2')
+    # Alle endringer lagres fortløpende, så turneringen kan gjenopprettes etter et krasj
+    journal = TournamentJournal(Journal(os.path.abspath('lagret_turnering')), tournament_model)
 
+    bracket_frame = TournamentBracketCanvas(master=main_frame, tournament_model=tournament_model)
 
-#fullscreen_button = ctk.CTkButton(master=timer_frame, text='Fullskjerm', command=fullscreen())
-#fullscreen_button.pack(pady=12, padx=10)
+# Kontrollvinduet lages i finish_startup, etter første bilde
+control_window = None
 
-# logo
-image_path = resource_path('graphics/menageriet_logo.png')
-image_light = Image.open(image_path)
-#image_dark = Image.open('menageriet_logo_dark.png')
-logo = ctk.CTkImage(light_image=image_light, dark_image=image_light, size=(200, 200))
 
-logo_label = ctk.CTkLabel(master=timer_frame, image=logo, text='')
-logo_label.pack(pady=12, padx=10, anchor='s')
+# Timere
+with startup.phase('timere'):
+    timer_label = ctk.CTkLabel(master=timer_frame, text='Countdown Timer', font=('Arial', 40))
+    timer_label.pack(pady=12, padx=10)
 
+    tick_scheduler.set_fps(SMOOTH_FPS)
+    # Én timer per bord; antallet kan endres i menyen mens programmet kjører
+    timer_bank = TimerBank(master=timer_frame, count=TABLES, initial_time=60*15)
 
-root.mainloop()
\ No newline at end of file
+
+#fullscreen_button = ctk.CTkButton(master=timer_frame, text='Fullskjerm', command=fullscreen())
+#fullscreen_button.pack(pady=12, padx=10)
+
+# logo – plassen holdes av med en gang, bildet settes inn når det er dekodet i bakgrunnen
+logo_label = ctk.CTkLabel(master=timer_frame, text='', width=200, height=200)
+logo_label.pack(pady=12, padx=10, anchor='s')
+logo_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='oppstart')
+
+# <Map> kommer når hovedvinduet er på skjermen; after_idle lar det tegnes ferdig først
+def on_map(event):
+    if event.widget is root:
+        root.after_idle(finish_startup)
+
+
+root.bind('<Map>', on_map)
+root.after(1000, finish_startup)  # reserve hvis <Map> aldri kommer (f.eks. minimert ved start)
+
+# Logger heng i hovedtråden (som fryser timerne) med stakk til heng.log
+watchdog = None
+if stall_watchdog.STALL_MS > 0:
+    watchdog = stall_watchdog.StallWatchdog(root)
+    watchdog.start()
+startup.mark('mainloop')
+
+root.mainloop()
+if watchdog is not None:
+    watchdog.stop()
+journal.close()
+logo_executor.shutdown(wait=False)
+if perf.ENABLED:
+    perf.stats.dump()
+    print(perf.stats.report())
+    print(f"Tidsmålingene er lagret i {os.path.abspath(perf.DUMP_PATH)}")
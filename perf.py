@@ -0,0 +1,138 @@
+"""
+Valgfri tidsmåling av tegne- og modellfunksjonene.
+
+Slås på med flagget --perf (python main.py --perf) eller miljøvariabelen BRACKETS_PERF=1.
+Da måles hvert kall til funksjonene som er merket med @timed, et overlegg på braketten
+(F3 slår det av og på) viser antall kall og p50/p95/maks per funksjon, og tallene skrives
+til BRACKETS_PERF_FILE (standard ytelse.json) ved avslutning.
+Er målingen av, returnerer @timed funksjonen uendret, så den koster ingenting.
+"""
+import os
+import sys
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+ENABLED = "--perf" in sys.argv or bool(os.environ.get("BRACKETS_PERF"))
+DUMP_PATH = os.environ.get("BRACKETS_PERF_FILE", "ytelse.json")
+
+
+class PerfStats:
+    """Antall kall og lengste tid totalt, og de siste `window` målingene (for persentiler), per navn."""
+    def __init__(self, window=2000):
+        self.window = window
+        self._samples = {}  # navn -> deque med varigheter i sekunder
+        self._counts = {}
+        self._max = {}
+        self._lock = threading.Lock()  # logoer dekodes i arbeidertråder
+
+    def add(self, name, seconds):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+                self._counts[name] = 0
+                self._max[name] = 0.0
+            samples.append(seconds)
+            self._counts[name] += 1
+            if seconds > self._max[name]:
+                self._max[name] = seconds
+
+    def summary(self):
+        """{navn: {"count", "p50_ms", "p95_ms", "max_ms"}}, tregeste (p95) først."""
+        with self._lock:
+            snapshot = [(name, sorted(samples), self._counts[name], self._max[name])
+                        for name, samples in self._samples.items()]
+        result = {name: {"count": count,
+                         "p50_ms": _percentile(ordered, 0.50) * 1e3,
+                         "p95_ms": _percentile(ordered, 0.95) * 1e3,
+                         "max_ms": longest * 1e3}
+                  for name, ordered, count, longest in snapshot}
+        return dict(sorted(result.items(), key=lambda item: -item[1]["p95_ms"]))
+
+    def report(self):
+        lines = [f"{'funksjon (ms)':<36}{'kall':>7}{'p50':>8}{'p95':>8}{'maks':>8}"]
+        for name, s in self.summary().items():
+            lines.append(f"{name:<36}{s['count']:7d}{s['p50_ms']:8.2f}{s['p95_ms']:8.2f}{s['max_ms']:8.2f}")
+        return "\n".join(lines)
+
+    def dump(self, path=None):
+        import json
+        with open(path or DUMP_PATH, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+            f.write("\n")
+
+
+def _percentile(ordered, q):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# Én felles samling for hele programmet
+stats = PerfStats()
+
+
+def timed(name):
+    """Dekorator som måler hvert kall under navnet name når målingen er slått på."""
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.add(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+class PerfOverlay:
+    """
+    Viser report() øverst til venstre på en Canvas, oppdatert hvert interval_ms.
+    Overlegget lages på nytt ved hver oppdatering, så det overlever canvas.delete("all")
+    i visningene og ligger alltid øverst.
+    """
+    tag = "perf_overlay"
+
+    def __init__(self, canvas, interval_ms=500, visible=True):
+        self.canvas = canvas
+        self.interval_ms = interval_ms
+        self.visible = False
+        self._after_id = None
+        if visible:
+            self.show()
+
+    def toggle(self, event=None):
+        if self.visible:
+            self.hide()
+        else:
+            self.show()
+
+    def show(self):
+        self.visible = True
+        if self._after_id is None:
+            self._tick()
+
+    def hide(self):
+        self.visible = False
+        if self._after_id is not None:
+            self.canvas.after_cancel(self._after_id)
+            self._after_id = None
+        self.canvas.delete(self.tag)
+
+    def _tick(self):
+        self._after_id = None
+        self.canvas.delete(self.tag)
+        text = self.canvas.create_text(12, 12, anchor="nw", text=stats.report(), font=("Courier", 11),
+                                       fill="#E0E0E0", tags=self.tag)
+        x0, y0, x1, y1 = self.canvas.bbox(text)
+        background = self.canvas.create_rectangle(x0 - 6, y0 - 6, x1 + 6, y1 + 6, fill="#111111",
+                                                  outline="#606060", tags=self.tag)
+        self.canvas.tag_raise(background)
+        self.canvas.tag_raise(text)
+        self._after_id = self.canvas.after(self.interval_ms, self._tick)
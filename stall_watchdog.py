@@ -0,0 +1,99 @@
+"""
+Vakthund for Tk-løkka: oppdager når hovedtråden henger (fildialoger, modale vinduer,
+tung tegning) og logger hva den holdt på med.
+"""
+import os
+import sys
+import threading
+import time
+import traceback
+
+import perf
+
+# Terskel og loggfil kan overstyres med miljøvariablene BRACKETS_STALL_MS (0 = av) og BRACKETS_STALL_LOG
+STALL_MS = int(os.environ.get("BRACKETS_STALL_MS", "250"))
+LOG_PATH = os.environ.get("BRACKETS_STALL_LOG", "heng.log")
+
+
+class StallWatchdog:
+    """
+    Et hjerteslag planlegges med after() på Tk-tråden hvert interval_ms og noterer når
+    det faktisk kjørte. En bakgrunnstråd sjekker at siste hjerteslag ikke er eldre enn
+    threshold_ms. Er det det, skrives hovedtrådens stakk akkurat da til loggen (én gang
+    per heng), og hvor lenge hengen varte når løkka svarer igjen.
+    Forsinkelsen på hvert hjerteslag telles også med i perf-målingene når de er slått på.
+    """
+    def __init__(self, widget, threshold_ms=STALL_MS, interval_ms=50, log_path=LOG_PATH):
+        self.widget = widget
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.log_path = log_path
+        self.stalls = 0
+        self.max_lag = 0.0
+        self._main_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stall_started = None  # tidspunktet siste hjerteslag kjørte, når en heng er logget
+        self._after_id = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Kalles fra Tk-tråden."""
+        self._main_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._after_id = self.widget.after(int(self.interval * 1000), self._beat)
+        self._thread = threading.Thread(target=self._watch, name="vakthund", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass  # vinduet kan allerede være ødelagt ved avslutning
+            self._after_id = None
+
+    # ---------- Tk-tråden ----------
+
+    def _beat(self):
+        now = time.monotonic()
+        lag = max(0.0, now - self._last_beat - self.interval)
+        self._last_beat = now
+        if lag > self.max_lag:
+            self.max_lag = lag
+        if perf.ENABLED:
+            perf.stats.add("Tk-løkke forsinkelse", lag)
+        if self._stall_started is not None:
+            self._log(f"Hovedtråden svarte igjen etter {(now - self._stall_started) * 1e3:.0f} ms")
+            self._stall_started = None
+        if not self._stop.is_set():
+            self._after_id = self.widget.after(int(self.interval * 1000), self._beat)
+
+    # ---------- Vakttråden ----------
+
+    def _watch(self):
+        check = max(self.threshold / 4, 0.01)
+        while not self._stop.wait(check):
+            last = self._last_beat
+            waited = time.monotonic() - last - self.interval
+            if waited <= self.threshold or self._stall_started is not None:
+                continue
+            frame = sys._current_frames().get(self._main_id)
+            if self._last_beat != last:
+                continue  # hjerteslaget kom mens vi sjekket
+            self._stall_started = last
+            self.stalls += 1
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "(ukjent)\n"
+            self._log(f"Hovedtråden har ikke svart på {waited * 1e3:.0f} ms. Den står her:\n{stack.rstrip()}")
+
+    def _log(self, message):
+        line = f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {message}\n"
+        if sys.stderr is not None:  # None i .exe uten konsoll
+            print(line, end="", file=sys.stderr)
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            pass
@@ -0,0 +1,32 @@
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """
+    Måler oppstarten fase for fase. phase() tar tiden på en blokk (en import, oppbygging
+    av et vindu osv.), mark() noterer et tidspunkt (f.eks. første bilde på skjermen).
+    report() gir en tabell der alt er regnet fra start, så oppstartstiden kan
+    sammenlignes mellom versjoner.
+    """
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.entries = []  # (navn, sekunder fra start, varighet i sekunder eller None for merker)
+
+    @contextmanager
+    def phase(self, name):
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.entries.append((name, begin - self.start, time.perf_counter() - begin))
+
+    def mark(self, name):
+        self.entries.append((name, time.perf_counter() - self.start, None))
+
+    def report(self):
+        lines = ["Oppstartstid (ms):", f"{'fase':<34}{'start':>9}{'varighet':>10}"]
+        for name, begin, duration in self.entries:
+            took = f"{duration * 1e3:10.1f}" if duration is not None else f"{'-':>10}"
+            lines.append(f"{name:<34}{begin * 1e3:9.1f}{took}")
+        return "\n".join(lines)
@@ -1,35 +1,120 @@
+import math
+import sys
+import time
 import customtkinter as ctk
+from perf import timed
+
+
+class TickScheduler:
+    """
+    Felles klokke for alle timere: én after()-kjede uansett hvor mange timere som går.
+    Hver timer teller ned mot en fast frist på time.monotonic(), og klokka våkner akkurat
+    når neste viste sekund skifter for en av dem. Kommer et tick for sent fordi hovedtråden
+    var opptatt, regnes gjenværende tid likevel fra fristen, så forsinkelsen hoper seg ikke opp.
+
+    Med fps > 0 animeres buene jevnt i tillegg: klokka våkner også for hvert bilde, og
+    bildefrekvensen (frame_rate) tilpasses slik at tegningen av alle timerne til sammen
+    holder seg under cpu_budget av hovedtråden. Den halveres når tickene kommer for sent
+    (hovedtråden er opptatt), og går sakte opp igjen mot fps når det er rolig.
+    """
+    cpu_budget = 0.05  # andel av hovedtråden animasjonen kan bruke
+    min_fps = 1
+
+    def __init__(self, fps=0):
+        self._timers = []
+        self._widget = None
+        self._after_id = None
+        self.fps = fps
+        self.frame_rate = fps
+        self._frame_cost = 0.0  # glidende snitt av hvor lang tid et bilde tar (sekunder)
+        self._planned = None    # når neste tick skulle komme
+
+    def set_fps(self, fps):
+        """Ønsket bildefrekvens for jevn animasjon; 0 gir bare ett tick per sekund."""
+        self.fps = self.frame_rate = max(0, fps)
+        self._frame_cost = 0.0
+        self._reschedule()
+
+    def add(self, timer):
+        if timer not in self._timers:
+            self._timers.append(timer)
+            if self._widget is None:
+                self._widget = timer.master.winfo_toplevel()
+        self._reschedule()
+
+    def remove(self, timer):
+        if timer in self._timers:
+            self._timers.remove(timer)
+        self._reschedule()
+
+    def _reschedule(self):
+        if self._after_id is not None:
+            self._widget.after_cancel(self._after_id)
+            self._after_id = None
+        if not self._timers:
+            return
+        now = time.monotonic()
+        wake = min(timer.next_change() for timer in self._timers)
+        if self.fps:
+            wake = min(wake, now + 1 / self.frame_rate)
+        self._planned = wake
+        self._after_id = self._widget.after(max(1, math.ceil((wake - now) * 1000)), self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        now = time.monotonic()
+        started = time.perf_counter()
+        for timer in list(self._timers):
+            timer.tick(now)
+        if self.fps:
+            self._adapt(now - self._planned, time.perf_counter() - started)
+        self._reschedule()
+
+    def _adapt(self, late, cost):
+        """Justerer frame_rate etter hvor lang tid bildet tok og hvor sent det kom."""
+        self._frame_cost = cost if not self._frame_cost else 0.8 * self._frame_cost + 0.2 * cost
+        if late > 0.5 / self.frame_rate:
+            rate = self.frame_rate / 2
+        else:
+            rate = self.frame_rate + 1
+        if self._frame_cost > 0:
+            rate = min(rate, self.cpu_budget / self._frame_cost)
+        self.frame_rate = max(self.min_fps, min(self.fps, rate))
+
+
+# Én felles klokke for alle timerne i programmet
+tick_scheduler = TickScheduler()
+
 
 class Timer:
-    def __init__(self, master, initial_time, timer_label):
+    def __init__(self, master, initial_time, timer_label, scheduler=None, size=250, pack=True):
         self.master = master
         self.initial_time = initial_time  # Starttid i sekunder
-        self.current_time = initial_time
+        self.current_time = initial_time  # Sekundene som vises (gjenværende tid rundet opp)
+        self.remaining = initial_time     # Gjenværende tid i sekunder når timeren står stille
+        self.deadline = None              # time.monotonic() når tiden er ute, mens timeren går
         self.paused = False
-        self.timer_id = None  # For å holde styr på etter-kall
+        self.scheduler = scheduler or tick_scheduler
 
         # Opprett en ramme for hver timer
         self.frame = ctk.CTkFrame(master)
-        self.frame.pack(pady=20, padx=20)
+        if pack:
+            self.frame.pack(pady=20, padx=20)
         
         # Timer label
         self._timer_label = ctk.CTkLabel(self.frame, text=timer_label, font=('Helvetica', 50))
         self._timer_label.pack(pady=10, padx=5)
         
         # Opprett en Canvas for sirkulær progress bar
-        self.canvas_size = 250
-        pad = 10
-
         bg_color = "#2b2b2b"
-        self.canvas = ctk.CTkCanvas(self.frame, width=self.canvas_size, height=self.canvas_size,
-                                bg=bg_color, highlightthickness=0)
+        self.canvas = ctk.CTkCanvas(self.frame, bg=bg_color, highlightthickness=0)
         self.canvas.pack(pady=5)
         # Tegn en bue (arc) som viser progresjonen
-        self.arc = self.canvas.create_arc(pad, pad, self.canvas_size - pad, self.canvas_size - pad,
-                                          start=90, extent=0, style="arc", width=15, outline="#4682B4")
+        self.arc = self.canvas.create_arc(0, 0, 0, 0, start=90, extent=0, style="arc", width=15, outline="#4682B4")
         # Tekst i midten av progress baren som viser nedtellingsformatet
-        self.canvas_text = self.canvas.create_text(self.canvas_size/2, self.canvas_size/2,
-                                                    text="", font=("Helvetica", 40), fill="white")
+        self.canvas_text = self.canvas.create_text(0, 0, text="", fill="white")
+        # Verdiene som står på canvas nå, så hvert tick bare endrer det som faktisk er nytt
+        self._shown = {"text": "", "fill": "white", "extent": 0, "outline": "#4682B4"}
         
         # Frame for buttons
         self.buttonframe = ctk.CTkFrame(self.frame)
@@ -50,44 +135,123 @@ class Timer:
         self.change_time_button = ctk.CTkButton(self.buttonframe, text="Change Time", command=self.open_change_time_popup)
         self.change_time_button.grid(row=1, column=1, padx=10, pady=5)
 
+        self.set_size(size)
+
+    def set_size(self, size):
+        """Skalerer timeren (canvas, skrift og knapper) til size piksler; 250 er full størrelse."""
+        self.canvas_size = size
+        scale = size / 250
+        pad = max(4, round(10 * scale))
+        ring = max(5, round(15 * scale))
+        self.canvas.configure(width=size, height=size)
+        self.canvas.coords(self.arc, pad, pad, size - pad, size - pad)
+        self.canvas.itemconfig(self.arc, width=ring)
+        self.canvas.coords(self.canvas_text, size / 2, size / 2)
+        self.canvas.itemconfig(self.canvas_text, font=("Helvetica", round(40 * scale)))
+        self._timer_label.configure(font=('Helvetica', round(50 * scale)))
+        for button in (self.start_button, self.pause_button, self.reset_button, self.change_time_button):
+            button.configure(width=round(140 * scale), height=round(28 * max(scale, 0.8)))
+        # Buen flyttes bare når endringen er minst en piksel langs omkretsen
+        self._extent_step = 360 / (math.pi * (size - 2 * pad))
         self.update_label()
 
-    def update_label(self):
-        """Oppdaterer teksten i progress baren og buens extent basert på gjenværende tid."""
+    def destroy(self):
+        self._stop()
+        self.frame.destroy()
+
+    def _draw(self, **values):
+        """
+        Setter text/fill på teksten og extent/outline på buen, men bare verdiene som
+        er endret siden sist – hvert itemconfig er en egen runde gjennom Tcl.
+        """
+        changed = {key: value for key, value in values.items() if self._shown[key] != value}
+        if not changed:
+            return
+        self._shown.update(changed)
+        text_options = {key: changed[key] for key in ("text", "fill") if key in changed}
+        arc_options = {key: changed[key] for key in ("extent", "outline") if key in changed}
+        if text_options:
+            self.canvas.itemconfig(self.canvas_text, **text_options)
+        if arc_options:
+            self.canvas.itemconfig(self.arc, **arc_options)
+
+    @timed("Timer.update_label")
+    def update_label(self, remaining=None):
+        """
+        Oppdaterer teksten i progress baren og buens extent basert på gjenværende tid.
+        Med remaining (sekunder, med desimaler) følger buen og fargen tiden jevnt
+        i stedet for å hoppe ett sekund av gangen.
+        """
         minutes, seconds = divmod(self.current_time, 60)
-        time_str = f"{minutes:02d}:{seconds:02d}"
-        self.canvas.itemconfig(self.canvas_text, text=time_str)
+        if remaining is None:
+            remaining = self.current_time
         # Kalkuler progresjon: 0 ved start, 1 når tiden er ute
         if self.initial_time > 0:
-            progress = (self.initial_time - self.current_time) / self.initial_time
+            progress = (self.initial_time - remaining) / self.initial_time
         else:
             progress = 0
-        # Oppdater buens extent (negativ for med klokka)
-        ext = -progress * 360
-        self.canvas.itemconfig(self.arc, extent=ext, outline='#4682B4')
         if progress > 8/10:
-            self.canvas.itemconfig(self.arc, outline='#C00020')
+            outline = '#C00020'
         elif progress > 3/4:
-            self.canvas.itemconfig(self.arc, outline='#C0A000')
-        
+            outline = '#C0A000'
+        else:
+            outline = '#4682B4'
+        # Buens extent (negativ for med klokka), rundet til hele piksler langs buen
+        ext = -round(progress * 360 / self._extent_step) * self._extent_step
+        self._draw(text=f"{minutes:02d}:{seconds:02d}", extent=ext, outline=outline)
 
     def countdown(self):
-        """Kjører nedtellingen og planlegger oppdateringer hvert sekund."""
+        """Starter (eller fortsetter) nedtellingen mot en frist regnet fra nå."""
         self.start_button.configure(state=ctk.DISABLED)
-        if self.current_time >= 0 and not self.paused:
-            self.update_label()
-            self.current_time -= 1
-            self.timer_id = self.master.after(1000, self.countdown)
-        if self.current_time < 0:
-            self.canvas.itemconfig(self.canvas_text, text="Ferdig!", fill="#B46246")
-            self.canvas.itemconfig(self.arc, extent=-359.999)
+        if self.paused or self.deadline is not None:
+            return
+        if self.remaining <= 0:
+            self.finish()
+            return
+        self.deadline = time.monotonic() + self.remaining
+        self.scheduler.add(self)
+
+    def next_change(self):
+        """
+        Tidspunktet (monotonic) da sekundet som vises nå skal skifte. Ligger det allerede
+        bak oss (hovedtråden var opptatt), vekker klokka timeren med en gang.
+        """
+        return self.deadline - (self.current_time - 1)
+
+    @timed("Timer.tick")
+    def tick(self, now):
+        """Kalles av klokka (hvert sekund, eller hvert bilde med jevn animasjon): viser gjenværende tid regnet fra fristen."""
+        remaining = self.deadline - now
+        if remaining <= 0:
+            self.finish()
+            return
+        seconds = math.ceil(remaining)
+        smooth = self.scheduler.fps > 0
+        if seconds != self.current_time:
+            self.current_time = seconds
+            self.update_label(remaining if smooth else None)
+        elif smooth:
+            # Bare buen kan ha flyttet seg; _draw hopper over det som er uendret
+            self.update_label(remaining)
+
+    def finish(self):
+        self._stop()
+        self.remaining = 0
+        self.current_time = 0
+        self._draw(text="Ferdig!", fill="#B46246", extent=-359.999)
+
+    def _stop(self):
+        """Stopper klokka og husker hvor mye tid som er igjen."""
+        if self.deadline is not None:
+            self.remaining = max(0.0, self.deadline - time.monotonic())
+            self.deadline = None
+        self.scheduler.remove(self)
 
     def toggle_pause(self):
         """Bytter mellom pause og fortsett."""
         if not self.paused:
             self.paused = True
-            if self.timer_id:
-                self.master.after_cancel(self.timer_id)
+            self._stop()
             self.pause_button.configure(text="Resume")
         else:
             self.paused = False
@@ -97,12 +261,11 @@ class Timer:
     def reset_timer(self):
         """Resetter timeren til startverdien."""
         self.start_button.configure(state=ctk.NORMAL)
-        if self.timer_id:
-            self.master.after_cancel(self.timer_id)
-        self.current_time = self.initial_time
+        self._stop()
+        self.current_time = self.remaining = self.initial_time
         self.paused = False
         self.pause_button.configure(text="Pause")
-        self.canvas.itemconfig(self.canvas_text, fill='white')
+        self._draw(fill='white')
         self.update_label()
         
     def open_change_time_popup(self):
@@ -124,17 +287,76 @@ class Timer:
 
         try:
             minutes, seconds = map(int, new_time.split(":"))
-            self.current_time = minutes * 60 + seconds
+            self.current_time = self.remaining = minutes * 60 + seconds
             self.initial_time = self.current_time
-            self.canvas.itemconfig(self.canvas_text, fill='white')
+            if self.deadline is not None:
+                # Går timeren, fortsetter den fra den nye tiden
+                self.deadline = time.monotonic() + self.remaining
+                self.scheduler.add(self)
+            self._draw(fill='white')
             self.update_label()
         except ValueError:
             self.open_change_time_popup()
             
             
+class TimerBank:
+    """
+    Én timer per bord, lagt i et rutenett som krymper timerne når det blir flere bord.
+    Antall bord velges i menyen øverst og kan endres mens timerne går: nye bord legges
+    til på slutten, og bare de siste bordene fjernes, så de andre fortsetter uforstyrret.
+    """
+    max_tables = 12
+
+    def __init__(self, master, count=2, initial_time=60*15, label="Bord {}"):
+        self.master = master
+        self.initial_time = initial_time
+        self.label = label
+        self.timers = []
+
+        self.frame = ctk.CTkFrame(master, fg_color="transparent")
+        self.frame.pack(fill="x")
+        menu_row = ctk.CTkFrame(self.frame, fg_color="transparent")
+        menu_row.pack(pady=(0, 5))
+        ctk.CTkLabel(menu_row, text="Antall bord:").pack(side="left", padx=5)
+        self.count_menu = ctk.CTkOptionMenu(menu_row, values=[str(n) for n in range(1, self.max_tables + 1)],
+                                            width=70, command=lambda value: self.resize(int(value)))
+        self.count_menu.pack(side="left", padx=5)
+        self.grid_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        self.grid_frame.pack()
+
+        self.resize(count)
+
+    @staticmethod
+    def layout_for(count):
+        """(kolonner, timerstørrelse i piksler) for så mange bord."""
+        if count <= 2:
+            return 1, 250
+        if count <= 6:
+            return 2, 180
+        return 3, 140
+
+    def resize(self, count):
+        count = max(1, min(count, self.max_tables))
+        self.count_menu.set(str(count))
+        columns, size = self.layout_for(count)
+
+        while len(self.timers) > count:
+            self.timers.pop().destroy()
+        for timer in self.timers:
+            if timer.canvas_size != size:
+                timer.set_size(size)
+        while len(self.timers) < count:
+            self.timers.append(Timer(self.grid_frame, self.initial_time, self.label.format(len(self.timers) + 1),
+                                     size=size, pack=False))
+
+        pad = 20 if columns == 1 else 6
+        for index, timer in enumerate(self.timers):
+            timer.frame.grid(row=index // columns, column=index % columns, padx=pad, pady=pad)
+
+
 if __name__ == "__main__":
     ctk.set_appearance_mode('dark')
     root = ctk.CTk()
     root.title('Timer')
-    timer = Timer(master=root, initial_time=20, timer_label='Timer')
+    bank = TimerBank(master=root, count=int(sys.argv[1]) if len(sys.argv) > 1 else 2, initial_time=20)
     root.mainloop()
\ No newline at end of file